@@ -0,0 +1,94 @@
+"""
+Benchmarks for loading the database (entries, developers, inspirations), load time and memory.
+
+Run from the code directory, for example: python benchmark_database.py
+"""
+
+import gc
+import time
+import tracemalloc
+from utils import osg, constants as c
+
+
+def load_database(compact):
+    """
+    Loads entries, developers and inspirations together (like the static website generator does).
+    """
+    entries = osg.read_entries(compact=compact)
+    developers = osg.read_developers(compact=compact)
+    inspirations = osg.read_inspirations(compact=compact)
+    return entries, developers, inspirations
+
+
+def measure_memory(compact):
+    """
+    Memory (in bytes) held by the loaded database. Parsers and parse cache are warmed up before.
+    """
+    load_database(compact)
+    gc.collect()
+    tracemalloc.start()
+    database = load_database(compact)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del database
+    return size
+
+
+def benchmark_memory():
+    """
+    Compares the memory used by the database as dictionaries with the compact representation (slotted records and
+    interned strings).
+    """
+    print('memory benchmark')
+    sizes = {}
+    for compact, name in ((False, 'dictionaries'), (True, 'compact records')):
+        sizes[name] = measure_memory(compact)
+        print(' {:<16} {:6.1f} MB'.format(name, sizes[name] / 2**20))
+    print(' compact records need {:.0%} of the memory'.format(sizes['compact records'] / sizes['dictionaries']))
+
+
+def legacy_developer_checks(developers):
+    """
+    The checks of read_developers as they were before check_listing (a quadratic duplicate name search and url prefix
+    tests per value), only for comparison.
+    """
+    names = [dev['Name'] for dev in developers]
+    duplicate_names = set(name for name in names if names.count(name) > 1)
+    for dev in developers:
+        for field in c.essential_developer_fields:
+            if field not in dev:
+                raise RuntimeError('Essential field "{}" missing in developer {}'.format(field, dev['Name']))
+        for field in dev.keys():
+            if field not in c.valid_developer_fields:
+                raise RuntimeError('Invalid field "{}" in developer {}.'.format(field, dev['Name']))
+        for field in c.url_developer_fields:
+            if field in dev:
+                if any(not (x.startswith('http://') or x.startswith('https://')) for x in dev[field]):
+                    raise RuntimeError('Invalid URL in field "{}" in developer {}.'.format(field, dev['Name']))
+    return duplicate_names
+
+
+def benchmark_load_time():
+    """
+    Compares the time of the checks when loading developers.md before (legacy_developer_checks) and after (single pass
+    in check_listing) as well as the total load times (with warm parse cache).
+    """
+    print('load time benchmark (developers.md)')
+    developers = list(osg.read_developers(compact=False).values())
+    times = {}
+    for name, check in (('before', legacy_developer_checks),
+                        ('after', lambda x: osg.check_listing(x, 'developer', c.essential_developer_fields, c.valid_developer_fields, c.url_developer_fields))):
+        start_time = time.perf_counter()
+        check(developers)
+        times[name] = time.perf_counter() - start_time
+        print(' checks {:<6} {:8.3f}s'.format(name, times[name]))
+    print(' checks are {:.0f} times faster'.format(times['before'] / times['after']))
+    start_time = time.perf_counter()
+    osg.read_developers()
+    print(' read_developers {:7.3f}s ({} developers)'.format(time.perf_counter() - start_time, len(developers)))
+
+
+if __name__ == "__main__":
+    benchmark_load_time()
+    benchmark_memory()
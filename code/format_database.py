@@ -0,0 +1,30 @@
+"""
+Writes entries, developers and inspirations in their canonical formatting. Only files whose content changes are
+written.
+
+Usage: python format_database.py [--check]
+
+With --check, nothing is written, only the files that differ from the canonical formatting are reported (and the
+exit status is non-zero if there are any). Suitable in CI.
+"""
+
+import sys
+import argparse
+from utils import osg
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Writes the database in canonical formatting.')
+    parser.add_argument('--check', action='store_true', help='only report files that differ from the canonical formatting')
+    args = parser.parse_args()
+
+    files = osg.write_entries(osg.read_entries(), check=args.check)
+    if osg.write_developers(osg.read_developers(), check=args.check):
+        files.append('developers.md')
+    if osg.write_inspirations(osg.read_inspirations(), check=args.check):
+        files.append('inspirations.md')
+
+    for file in files:
+        print(' {}'.format(file))
+    print('{} file(s) {}'.format(len(files), 'differ from the canonical formatting' if args.check else 'changed'))
+    sys.exit(1 if args.check and files else 0)
@@ -68,14 +68,24 @@ Sitemap is not needed, only for large projects with lots of JavaScript und many
 # TODO inspirations: add media links and genres, maybe also years and original developer
 
 import os
-import shutil
+import io
+import re
+import sys
 import math
 import datetime
 import time
 import json
+import pickle
+import signal
+import argparse
+import threading
+import http.server
+import concurrent.futures
+from collections import namedtuple
 from functools import partial
-from utils import osg, constants as c, utils, osg_statistics as stat, osg_parse
-from jinja2 import Environment, FileSystemLoader
+from utils import osg, constants as c, utils, osg_statistics as stat, osg_parse, cache, website, svg_charts
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+from markupsafe import Markup
 import html5lib
 
 # the categories for the alphabetical indices, letters A-Z, used for identification and as link names internally
@@ -174,11 +184,41 @@ non_game_category_names = {
     'game engine': 'Game Engines'
 }
 
-# we check the output html structure every time
+# for the full check of the output html structure
 html5parser = html5lib.HTMLParser(strict=True)
 
-# file hashes for detecting changes
-previous_files = {}
+# maximal number of developers or inspirations on a single page (letters with more are split into multiple pages)
+listing_page_size = 500
+
+# validation of the generated pages, fast (structure only) or full (html5lib, for CI)
+validation_modes = ('fast', 'full')
+
+# how the pages are written: validation mode, minified or not, with precompressed siblings or not
+OutputOptions = namedtuple('OutputOptions', ('validation', 'minify', 'compress'), defaults=('fast', True, False))
+
+# style sheets that are purged of the rules for classes not used on the website (see used_classes)
+purged_stylesheets = ('bulma.min.css',)
+
+# output directories only containing outputs of the build (assets and pages), anything else in them is removed
+generated_directories = ('css', 'js', 'screenshots', 'data', 'games', 'frameworks', 'inspirations', 'developers', 'statistics')
+
+# the listing templates and the templates of their items (see render_fragments)
+fragment_templates = {
+    'listing_entries.jinja': 'entry.jinja',
+    'listing_developers.jinja': 'developer.jinja',
+    'listing_inspirations.jinja': 'inspiration.jinja'
+}
+
+# Jinja environment, build digest and fragment cache of this process (see init_renderer)
+_environment = None
+_build = None
+_fragment_cache = None
+
+# how often the sources are checked for changes in watch mode (in seconds)
+watch_interval = 0.3
+
+# the last updated time of the pages and the date of the svg charts (they change with every build)
+regex_timestamps = re.compile(r'(?<=Last updated: )\d{4}-\d\d-\d\d \d\d:\d\d|(?<=<dc:date>)[^<]*')
 
 # pluralization (mostly with s, but there are a few exceptions)
 plurals = {k: k+'s' for k in ('Assets license', 'Contact', 'Code language', 'Code license', 'Developer', 'Download', 'Inspiration', 'Game', 'Keyword', 'Home', 'Homepage', 'Organization', 'Platform', 'Tag')}
@@ -199,16 +239,27 @@ def get_plural_or_singular(name, amount):
     return plurals[name]
 
 
-def file_hash(text):
+def content_digest(text):
     """
-    Removes the last updated ... line from html file and the data line from svg and then computes a hash.
+    Removes the last updated ... time from html file and the date from svg and then computes a stable digest (the
+    same in every process and every build).
     :param text:
     :return:
     """
-    text = text.split('\n')
-    text = [t for t in text if not any(t.startswith(prefix) for prefix in ('  This website is built ', '    <dc:date>'))]
-    text = ''.join(text)
-    return hash(text)
+    return cache.digest(regex_timestamps.sub('', text))
+
+
+def page_content_digest(text, options):
+    """
+    Content digest of a written page (see content_digest), which also covers its compressed versions if they are
+    written.
+    :param text: The page as written (minified or not)
+    :param options: Output options (see OutputOptions)
+    """
+    content = content_digest(text)
+    if options.compress:
+        content = cache.digest(content, *website.compressed_encodings)
+    return content
 
 
 def raise_helper(msg):
@@ -219,54 +270,288 @@ def raise_helper(msg):
     raise Exception(msg)
 
 
-def write(text, file):
+def validate(text, file, validation):
+    """
+    Checks a generated HTML page, either with the full HTML parser (html5lib, slow) or only structurally (see
+    website.check_tag_balance, fast).
+    :param validation: One of validation_modes
+    :return: Time the validation took
     """
-    Writes a generated HTML page to a file, but checks with a HTML parser before.
+    start_time = time.perf_counter()
+    try:
+        if validation == 'full':
+            html5parser.parse(text)
+        elif validation == 'fast':
+            website.check_tag_balance(text)
+        else:
+            raise RuntimeError('Unknown validation mode "{}"'.format(validation))
+    except Exception as e:
+        utils.write_text(os.path.join(c.web_path, 'invalid.html'), text)  # for further checking with https://validator.w3.org/
+        print('problem with file {}, see invalid.html'.format(file))
+        raise RuntimeError(e)
+    return time.perf_counter() - start_time
+
+
+def write(text, file, previous_content=None, options=None):
+    """
+    Writes a generated HTML page to a file, but validates it before. Optionally minified and with precompressed
+    siblings.
     :param text:
-    :param file:
+    :param file: The (staged) output file
+    :param previous_content: Content digest of the existing file (see page_content_digest), if known
+    :param options: Output options (see OutputOptions)
+    :return: tuple (content digest of the text, time the validation took, sizes or None if nothing was written)
     """
-    # output file
-    if isinstance(file, str):
-        file = [file]
-    file = os.path.join(c.web_path, *file)
+    options = options or OutputOptions()
+    rendered_size = len(text.encode('utf-8'))
+    if options.minify:
+        text = website.minify_html(text)
 
-    # check file hash and use previous version
-    if file in previous_files and previous_files[file]['hash'] == file_hash(text):
-        # no significant change, use previous version instead
-        text = previous_files[file]['text']
-    else:
-        # validate text
-        try:
-            html5parser.parse(text)
-        except Exception as e:
-            utils.write_text(os.path.join(c.web_path, 'invalid.html'), text)  # for further checking with https://validator.w3.org/
-            print('problem with file {}, see invalid.html'.format(file))
-            raise RuntimeError(e)
+    # no significant change, keep the existing file (only changed pages are validated)
+    content = page_content_digest(text, options)
+    if content == previous_content:
+        return content, 0, None
 
-    # create output directory if necessary
-    containing_dir = os.path.dirname(file)
-    if not os.path.isdir(containing_dir):
-        os.mkdir(containing_dir)
+    # validate text
+    validation_time = validate(text, file, options.validation)
 
-    # write text
+    # write text (and its compressed versions)
     utils.write_text(file, text)
+    data = text.replace('\n', os.linesep).encode('utf-8')  # as written
+    sizes = {'rendered': rendered_size, 'written': len(data)}
+    if options.compress:
+        sizes.update(website.write_compressed(file, data))
+    return content, validation_time, sizes
+
+
+# a page of the website: output file (as list), template name, base (of this page), context for rendering the
+# template and ids of the entries, developers and inspirations shown on the page (its inputs, only used to render
+# the largest pages first, whether a page is up to date only depends on its digest, see page_digest)
+# pages are self-contained and picklable, so that they can be rendered in other processes
+Page = namedtuple('Page', ('file', 'template', 'base', 'context', 'inputs'))
+
+
+def make_page(site, file, template, title, active_nav, inputs=(), css=(), js=(), **context):
+    """
+    Creates a page with its own base dictionary. Links on the page are relative to the directory of the page.
+    :param site: Common to all pages (creation date, css and js)
+    :param css: Additional style sheets of this page
+    :param js: Additional scripts of this page
+    """
+    base = {
+        'title': title,
+        'creation-date': site['creation-date'],
+        'css': site['css'] + list(css),
+        'js': site['js'] + list(js),
+        'url_to': partial(url_to, file[:-1]),
+        'active_nav': active_nav
+    }
+    return Page(file, template, base, context, list(inputs))
+
+
+def input_ids(kind, items):
+    """
+    Ids of entries ('entry'), developers ('developer') or inspirations ('inspiration') as inputs of pages.
+    """
+    key = 'File' if kind == 'entry' else 'Name'
+    return ['{}:{}'.format(kind, item[key]) for item in items]
+
+
+def build_digest():
+    """
+    Digest of the templates and of this generator. If they change, all pages need to be rendered again.
+    """
+    parts = []
+    for file in sorted(os.listdir(c.web_template_path)):
+        if file.endswith('.jinja'):
+            parts.extend((file, utils.read_text(os.path.join(c.web_template_path, file))))
+    parts.append(utils.read_text(__file__))
+    return cache.digest(*parts)
+
+
+def page_digest(page, build, options=None):
+    """
+    Digest of everything a page is rendered from (the context includes all the entries, developers or inspirations
+    shown on the page, already converted including their links) and how it is written.
+    :param options: Output options (see OutputOptions), the validation mode does not change the page
+    """
+    options = options or OutputOptions()
+    base = {k: v for k, v in page.base.items() if k != 'creation-date'}  # the date alone is no reason to render again
+    return cache.digest(build, repr((options.minify, options.compress)), page.template, stable_pickle((base, page.context)))
+
+
+def stable_pickle(obj):
+    """
+    Pickles without memo, otherwise the pickle would depend on which equal strings happen to be the same object.
+    """
+    f = io.BytesIO()
+    pickler = pickle.Pickler(f, protocol=4)
+    pickler.fast = True
+    pickler.dump(obj)
+    return f.getvalue()
+
+
+def init_renderer(build):
+    """
+    Creates the Jinja environment and the fragment cache of this process (also used as initializer of the worker
+    processes).
+
+    The compiled templates are stored in a persistent bytecode cache (checked against the template source), which
+    is safe to share between processes (written atomically). An existing environment for the same build is kept (watch
+    mode).
+    :param build: Digest of the templates and the generator (see build_digest)
+    """
+    global _environment, _build, _fragment_cache
+    if _environment is not None and _build == build:
+        return
+    os.makedirs(c.website_bytecode_path, exist_ok=True)
+    _environment = Environment(loader=FileSystemLoader(c.web_template_path), bytecode_cache=FileSystemBytecodeCache(c.website_bytecode_path), autoescape=True)
+    _environment.globals['raise'] = raise_helper
+    _environment.globals['is_list'] = lambda obj: isinstance(obj, list)
+    _build = build
+    _fragment_cache = cache.DiskCache(c.website_fragments_path, c.website_fragments_max_size)
+
+
+def init_renderer_process(build):
+    """
+    Initializer of the renderer processes kept for multiple builds (see renderer_pool). They ignore Ctrl+C, the main
+    process shuts them down.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    init_renderer(build)
 
 
-def sort_into_categories(items, categories, fit, unknown_category_name=None):
+def renderer_pool(build):
+    """
+    A pool of renderer processes kept for multiple builds (watch mode), each with its own Jinja environment (see
+    render_page). The caller has to shut it down.
+    :param build: Digest of the templates and the generator (see build_digest)
     """
-    Given a list of items and a list of categories and a way to determine if an item fits into a category creates
-    lists of items fitting in each category as well as a list of items that fit in no category.
+    return concurrent.futures.ProcessPoolExecutor(initializer=init_renderer_process, initargs=(build,))
 
+
+def render_fragments(page):
+    """
+    Renders the items of a listing page separately. An item is only rendered if it is not in the fragment cache yet,
+    which persists across builds and is shared by all listing pages in the same directory (links are relative).
+    :return: tuple (list of fragments, number of rendered fragments)
+    """
+    template_name = fragment_templates[page.template]
+    directory = '/'.join(page.file[:-1])
+    template = None
+    fragments = []
+    rendered = 0
+    for item in page.context['listing']['items']:
+        key = cache.digest(_build, template_name, directory, stable_pickle(item))
+        fragment = _fragment_cache.get(key)
+        if fragment is None:
+            if template is None:
+                template = _environment.get_template(template_name)
+            fragment = template.render(base=page.base, item=item)
+            _fragment_cache.put(key, fragment)
+            rendered += 1
+        fragments.append(Markup(fragment))
+    return fragments, rendered
+
+
+def render_page(job):
+    """
+    Renders a page and writes it (after validation).
+    :param job: tuple (page, staged output file, content digest of the existing file or None, output options, digest
+    of the templates and the generator)
+    :return: tuple (content digest of the page, time the validation took, sizes or None, number of rendered fragments)
+    """
+    page, file, previous_content, options, build = job
+    init_renderer(build)  # processes kept for multiple builds (watch mode) might still have an older environment
+    context = page.context
+    rendered = 0
+    if page.template in fragment_templates:
+        fragments, rendered = render_fragments(page)
+        context = dict(context, fragments=fragments)
+    text = _environment.get_template(page.template).render(base=page.base, **context)
+    return write(text, file, previous_content, options) + (rendered,)
+
+
+def render_pages(pages, manifest, build, parallel=True, options=OutputOptions(), max_workers=None, executor=None):
+    """
+    Renders and writes all pages that are not up to date according to the build manifest.
+    :param parallel: If True, the pages are rendered (and validated) in multiple processes
+    :param options: Output options (see OutputOptions)
+    :param max_workers: Number of processes (default: number of processors)
+    :param executor: Pool of renderer processes kept for multiple builds (see renderer_pool) to use instead of
+    starting new ones, if parallel
+    """
+    start_time = time.perf_counter()
+    outdated = []
+    for page in pages:
+        path = '/'.join(page.file)
+        digest = page_digest(page, build, options)
+        # a page is only up to date together with its compressed versions
+        siblings = [path + '.' + encoding for encoding in website.compressed_encodings] if options.compress else []
+        page_current = manifest.is_current(path, digest)
+        siblings_current = manifest.all_current(siblings, digest)
+        if not (page_current and siblings_current):
+            # without the compressed versions, the page needs to be written again even if it did not change
+            previous_content = manifest.content(path, partial(page_content_digest, options=options)) if siblings_current else None
+            outdated.append((page, digest, previous_content))
+
+    # largest pages (most inputs) first, for an even load of the processes
+    outdated.sort(key=lambda x: len(x[0].inputs), reverse=True)
+    jobs = [(page, manifest.staged('/'.join(page.file)), previous_content, options, build) for page, _, previous_content in outdated]
+    if parallel and len(jobs) > 1 and executor is not None:
+        results = list(executor.map(render_page, jobs))
+    elif parallel and len(jobs) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=init_renderer, initargs=(build,)) as executor:
+            results = list(executor.map(render_page, jobs))
+    else:
+        init_renderer(build)
+        results = [render_page(job) for job in jobs]
+
+    # only record them when all are written
+    for (page, digest, _), (content, _, _, _) in zip(outdated, results):
+        path = '/'.join(page.file)
+        manifest.update(path, digest, content)
+        if options.compress:
+            for encoding in website.compressed_encodings:
+                manifest.update(path + '.' + encoding, digest)
+    changed = sum(1 for (_, _, sizes, _) in results if sizes)
+    print('{} of {} pages rendered, {} changed, {} fragments rendered (took {:.1f}s)'.format(len(outdated), len(pages), changed, sum(result[3] for result in results), time.perf_counter() - start_time))
+    print('{} validation of {} pages took {:.1f}s'.format(options.validation, changed, sum(result[1] for result in results)))
+
+    # sizes of the written pages per section (directory)
+    sections = {}
+    for (page, _, _), (_, _, sizes, _) in zip(outdated, results):
+        if sizes:
+            totals = sections.setdefault(page.file[0] if len(page.file) > 1 else 'top level', {})
+            for key, size in sizes.items():
+                totals[key] = totals.get(key, 0) + size
+    for section, totals in sorted(sections.items()):
+        text = ', '.join('{} {:.2f} MB'.format(key, totals[key] / 2**20) for key in website.compressed_encodings if key in totals)
+        print(' {}: {:.2f} MB rendered, {:.2f} MB written ({:.0%} saved){}'.format(section, totals['rendered'] / 2**20, totals['written'] / 2**20, 1 - totals['written'] / totals['rendered'], ', ' + text if text else ''))
+
+
+def sort_into_categories(items, categories, keys, unknown_category_name=None):
+    """
+    Given a list of items and a list of categories and a way to get the categories (keys) of an item creates lists of
+    items fitting in each category as well as a list of items that fit in no category. Single pass over the items,
+    the order of the items is kept in every list.
+
+    :param keys: Function returning the keys of an item (any iterable), keys that are not categories are ignored
     :return: A mapping category (or unknown_category_name) -> sub-list of items in that category
     """
-    categorized_sublists = {}
-    for category in categories:
-        sublist = [item for item in items if fit(item, category)]
-        categorized_sublists[category] = sublist
+    categorized_sublists = {category: [] for category in categories}
+    unknown = []
+    for item in items:
+        fits = False
+        for key in keys(item):
+            sublist = categorized_sublists.get(key)
+            if sublist is not None and (not sublist or sublist[-1] is not item):  # each item only once per category
+                sublist.append(item)
+                fits = True
+        if not fits:
+            unknown.append(item)
     if unknown_category_name:
-        # now those that do not fit
-        sublist = [item for item in items if not any(fit(item, category) for category in categories)]
-        categorized_sublists[unknown_category_name] = sublist
+        categorized_sublists[unknown_category_name] = unknown
     return categorized_sublists
 
 
@@ -319,17 +604,19 @@ def url_to(current, target, info=None):
     return url
 
 
-def preprocess(items, key, url):
+def preprocess(items, key, url, page_size=None):
     """
     Sets a few additional fields in the entries, inspirations, developers in order to generate the right content from
     them later.
 
     :param url:
-    :param items:
+    :param items: Sorted alphabetically
     :param key:
+    :param page_size: If given, letters with more items are split into multiple pages (see page_name)
     :return:
     """
     _ = set() # this is just to avoid duplicating anchors
+    positions = {}
     for item in items:
         # add unique anchor ref
         anchor = osg.canonical_name(item[key])
@@ -345,7 +632,51 @@ def preprocess(items, key, url):
         if not start in alphabet:
             start = extra
         item['letter'] = start
-        item['href'] = url + ['{}.html#{}'.format(start, anchor)]
+
+        # the page of the item (items are sorted) and the link to it
+        position = positions.get(start, 0)
+        positions[start] = position + 1
+        item['page'] = page_name(start, position, page_size)
+        item['href'] = url + ['{}.html#{}'.format(item['page'], anchor)]
+
+
+def page_name(letter, position, page_size):
+    """
+    Name of the page (file name without .html) for the item at a position in the (sorted) items of a letter. Only if
+    there are more than page_size items, the letter is split into pages A, A-2, A-3, ... (the first page keeps the
+    name of the unsplit letter, so existing links to it still work)
+    """
+    if not page_size or position < page_size:
+        return letter
+    return '{}-{}'.format(letter, position // page_size + 1)
+
+
+def paginate(letter, items):
+    """
+    The pages of a letter (see preprocess and page_name), there is always at least one.
+    :param items: The items of the letter (in order)
+    :return: List of (page name, items on that page)
+    """
+    pages = {}
+    for item in items:
+        pages.setdefault(item['page'], []).append(item)
+    return list(pages.items()) or [(letter, [])]
+
+
+def make_pager(path, pages, current):
+    """
+    Links to all pages of a letter, the current page highlighted.
+    :param path: Path of the pages
+    :param pages: See paginate
+    :param current: Index of the current page
+    """
+    links = []
+    for index, (name, _) in enumerate(pages):
+        if index == current:
+            links.append(make_text(str(index + 1), 'has-text-weight-semibold'))
+        else:
+            links.append(make_url(path + ['{}.html'.format(name.capitalize())], str(index + 1)))
+    return [make_text('Pages: '), make_enumeration(links, ' ')]
 
 
 def entry_index(entry):
@@ -883,52 +1214,127 @@ d    """
             entry['screenshots'] = screenshots
 
 
-def create_table_json_data(entries):
+def create_table_json_data(entries, manifest):
     """
     We assume that everything including internal is setup correctly.
     Columns are Title, Link (entry, first homepage), State, Essential Keywords, Language, License
+
+    The data is compact and stored column wise (expanded by the table page): title, anchor of the entry and first
+    homepage as plain strings, the page of the entry as integer code and the values of state, tags, platform,
+    language and license as lists of integer codes into a vocabulary for each of them. Also written precompressed.
     :param entries:
     :return:
     """
-    # create json structure
-    db = {'headings': ['Title', 'State', 'Tags', 'Platform', 'Language', 'License']}
-    data = []
+    # create columns, dictionary encoded
+    vocabularies = {column: {} for column in ('page', 'state', 'tags', 'platform', 'language', 'license')}
+    columns = {column: [] for column in ('title', 'anchor', 'home')}
+    columns.update({column: [] for column in vocabularies})
+
+    def add(column, values):
+        vocabulary = vocabularies[column]
+        columns[column].append([vocabulary.setdefault(value, len(vocabulary)) for value in values])
+
+    for entry in sorted(entries, key=lambda x: str.casefold(x['Title'])):
+        columns['title'].append(entry['Title'])
+        page, anchor = url_to([], entry['href']).split('#')
+        columns['page'].append(vocabularies['page'].setdefault(page, len(vocabularies['page'])))
+        columns['anchor'].append(anchor)
+        columns['home'].append(entry['Home'][0])
+        add('state', entry['State'])
+        add('tags', [tag for tag in entry['Keyword'] if tag in c.interesting_keywords])
+        add('platform', entry.get('Platform', ['-']))
+        add('language', entry['Code language'])
+        add('license', entry['Code license'])
+    db = {
+        'headings': ['Title', 'State', 'Tags', 'Platform', 'Language', 'License'],
+        'vocabularies': {column: list(vocabulary) for column, vocabulary in vocabularies.items()},
+        'columns': columns
+    }
+
+    # write out (with compressed versions), compared to the previous format
+    sizes = write_data(db, 'data/entries.json', manifest)
+    if sizes:
+        size, compressed_sizes = sizes
+        previous_size = len(json.dumps(expand_table_data(db), indent=1).encode('utf-8'))
+        compressed = ', '.join('{} {:.0f} kB'.format(encoding, compressed_size / 1024) for encoding, compressed_size in compressed_sizes.items())
+        print('table data {:.0f} kB instead of {:.0f} kB in the previous format ({:.0%} smaller), {} ({} entries)'.format(size / 1024, previous_size / 1024, 1 - size / previous_size, compressed, len(entries)))
+
+
+def expand_table_data(db):
+    """
+    The table data in the previous format (a row of formatted strings for every entry, links as html), like the table
+    page expands it. Only used to compare the sizes.
+    :param db: The compact table data (see create_table_json_data)
+    """
+    columns, vocabularies = db['columns'], db['vocabularies']
+
+    def decode(column, index):
+        return ', '.join(vocabularies[column][code] for code in columns[column][index])
+
+    rows = []
+    for index, title in enumerate(columns['title']):
+        href = '{}#{}'.format(vocabularies['page'][columns['page'][index]], columns['anchor'][index])
+        link = '<a href="{}" class="has-text-weight-semibold">{}</a> <a href="{}"><i class="icon-new-tab"></i></a>'.format(href, title, columns['home'][index])
+        rows.append([link] + [decode(column, index) for column in ('state', 'tags', 'platform', 'language', 'license')])
+    return {'headings': db['headings'], 'data': rows}
+
+
+def create_search_index(entries, manifest):
+    """
+    Writes the shards of the search index (see website.search_index) over titles, keywords, developers, inspirations
+    and code dependencies of the entries. Only changed shards are written.
+    """
+    documents = []
     for entry in entries:
-        title = '<a href="{}" class="has-text-weight-semibold">{}</a> <a href="{}"><i class="icon-new-tab"></i></a>'.format(url_to([], entry['href']), entry['Title'], entry['Home'][0])
-        state = ', '.join(entry['State'])
-        tags = entry['Keyword']
-        tags = [tag for tag in tags if tag in c.interesting_keywords]
-        tags = ', '.join(tags)
-        platform = entry.get('Platform', ['-'])
-        platform = ', '.join(platform)
-        language = ', '.join(entry['Code language'])
-        license = entry['Code license']
-        license = ', '.join(license)
-        data.append([title, state, tags, platform, language, license])
-    data.sort(key=lambda x: str.casefold(x[0]))
-    db['data'] = data
-
-    # write out
-    text = json.dumps(db, indent=1)
-    os.makedirs(c.web_data_path, exist_ok=True)
-    utils.write_text(os.path.join(c.web_data_path, 'entries.json'), text)
-
-
-def create_statistics_section(entries, field, title, file_name, chartmaker, sub_field=None):
+        texts = [entry['Title']]
+        for field in ('Keyword', 'Developer', 'Inspiration', 'Code dependency'):
+            texts.extend(entry.get(field, []))
+        documents.append((entry['Title'], url_to([], entry['href']), texts))
+    shards = website.search_index(documents)
+    written = sum(1 for name, shard in shards.items() if write_data(shard, 'data/search/{}.json'.format(name), manifest))
+    print('search index with {} terms in {} shards ({} written)'.format(sum(len(shard['terms']) for shard in shards.values()), len(shards), written))
+
+
+def write_data(data, path, manifest):
+    """
+    Writes data for the scripts of the website as compact json together with compressed versions, if it changed.
+    :param data: Any json serializable data
+    :param path: Output path (relative, with slashes)
+    :return: Size of the json and dictionary encoding -> size of the compressed versions or None if up to date
+    """
+    text = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+    digest = cache.digest(text)
+    if manifest.all_current([path] + [path + '.' + encoding for encoding in website.compressed_encodings], digest):
+        return None
+    file = manifest.staged(path)
+    utils.write_text(file, text)
+    data = text.encode('utf-8')
+    sizes = website.write_compressed(file, data)
+    for encoding in website.compressed_encodings:
+        manifest.update(path + '.' + encoding, digest)
+    manifest.update(path, digest)
+    return len(data), sizes
+
+
+def create_statistics_section(entries, field, title, file_name, chartmaker, manifest, build, sub_field=None, chart_backend='svg'):
     """
     Creates a statistics section for a given field name from entries and a given chart type (see stat.export_xxx_chart)
+    The chart is only created again if the statistics changed (see build manifest).
+    :param chart_backend: One of stat.chart_backends
     :return:
     """
     statistics = stat.get_field_statistics(entries, field, sub_field)
     statistics = stat.truncate_stats(statistics, 10)
-    file = os.path.join(c.web_path, 'statistics', file_name)
-    chartmaker([s for s in statistics if s[0] != 'N/A'], file)
-    # read back and check if identical with old version (up to date)
-    text = utils.read_text(file)
-    if file in previous_files and previous_files[file]['hash'] == file_hash(text):
-        # use old version instead
-        text = previous_files[file]['text']
-        utils.write_text(file, text)
+    path = '/'.join(statistics_path + [file_name])
+    digest = cache.digest(build, utils.read_text(stat.__file__), utils.read_text(svg_charts.__file__), chart_backend, repr(statistics))
+    if not manifest.is_current(path, digest):
+        # keep the existing file if there is no significant change
+        file = manifest.staged(path)
+        chartmaker([s for s in statistics if s[0] != 'N/A'], file, backend=chart_backend)
+        content = content_digest(utils.read_text(file))
+        if content == manifest.content(path, content_digest):
+            os.remove(file)
+        manifest.update(path, digest, content=content)
     section = {
         'title': title,
         'id': osg.canonical_name(title),
@@ -938,13 +1344,101 @@ def create_statistics_section(entries, field, title, file_name, chartmaker, sub_
     return section
 
 
-def generate(entries, inspirations, developers):
+def used_classes():
+    """
+    All words in the templates, in this generator and in the scripts of the website. Classes on the website are only
+    taken from there as a whole, so every used class is one of them (the icon classes are composed, but they are
+    defined in osgl.min.css, which is not purged). See also check_used_classes.
+    """
+    files = [os.path.join(c.web_template_path, file) for file in os.listdir(c.web_template_path) if file.endswith('.jinja')]
+    files.append(__file__)
+    js_path = os.path.join(c.web_template_path, 'js')
+    files.extend(os.path.join(js_path, file) for file in os.listdir(js_path) if file.endswith('.js'))
+    return set(word for file in files for word in re.findall(r'[\w-]+', utils.read_text(file)))
+
+
+def check_used_classes(manifest, classes):
+    """
+    Checks that the classes used in the written pages are not missing in the purged style sheets, which would mean
+    that a class is composed somewhere. Raises a RuntimeError otherwise.
+    :param classes: The classes kept when purging (see used_classes)
     """
-    Regenerates the whole static website given an already imported set of entries, inspirations and developers.
+    purged = set()
+    for name in purged_stylesheets:
+        purged |= website.css_classes(utils.read_text(os.path.join(c.web_template_path, 'css', name))) - classes
+    for dirpath, _, filenames in os.walk(manifest.staging_path):
+        for file in filenames:
+            if file.endswith('.html'):
+                missing = website.html_classes(utils.read_text(os.path.join(dirpath, file))) & purged
+                if missing:
+                    raise RuntimeError('Classes {} used in {} but purged from the style sheets'.format(', '.join(sorted(missing)), file))
+
+
+def sync_assets(manifest, classes, mode='copy'):
+    """
+    Brings css, js, screenshots and a few other files in the output directory up to date. Only new or changed files
+    are placed (copied or linked, see website.place_file), stale files are removed at the end of the build.
+
+    Style sheets and scripts get the digest of their content in their names (see website.fingerprint), so they can
+    be cached forever. The style sheets in purged_stylesheets only keep the rules for the given classes.
+    :param classes: The classes used on the website (see used_classes)
+    :return: Dictionary name -> fingerprinted name of the style sheets and scripts
+    """
+    start_time = time.perf_counter()
+    files = []
+    fingerprinted = {}
+    purged = 0
+
+    # css and js, files in subdirectories (fonts) are referenced by the style sheets by their names
+    for directory in ('css', 'js'):
+        source_path = os.path.join(c.web_template_path, directory)
+        for dirpath, _, filenames in os.walk(source_path):
+            for file in filenames:
+                source = os.path.join(dirpath, file)
+                if dirpath != source_path:
+                    files.append((directory + '/' + os.path.relpath(source, source_path).replace(os.sep, '/'), source))
+                elif file in purged_stylesheets:
+                    text = website.purge_css(utils.read_text(source), classes)
+                    fingerprinted[file] = website.fingerprint(file, text.encode('utf-8'))
+                    path = directory + '/' + fingerprinted[file]
+                    if not manifest.is_current(path, cache.digest(text)):
+                        utils.write_text(manifest.staged(path), text)
+                        manifest.update(path, cache.digest(text))
+                        purged += 1
+                        print('{} purged from {:.0f} kB to {:.0f} kB'.format(file, os.path.getsize(source) / 1024, len(text.encode('utf-8')) / 1024))
+                else:
+                    with open(source, 'rb') as f:
+                        fingerprinted[file] = website.fingerprint(file, f.read())
+                    files.append((directory + '/' + fingerprinted[file], source))
+
+    # screenshots
+    files.extend(('screenshots/' + file, os.path.join(c.screenshots_path, file)) for file in os.listdir(c.screenshots_path) if file.endswith('.jpg'))
+
+    # collage_image and google search console token and favicon.svg
+    files.extend((file, os.path.join(c.web_template_path, file)) for file in ('collage_games.jpg', 'google1f8a3863114cbcb3.html', 'favicon.svg'))
+
+    placed = sum(1 for path, source in files if manifest.sync(path, source, mode)) + purged
+    print('{} of {} assets placed (took {:.1f}s)'.format(placed, len(files) + len(purged_stylesheets), time.perf_counter() - start_time))
+    return fingerprinted
+
+
+def generate(entries, inspirations, developers, manifest, assets, parallel=True, options=OutputOptions(), page_size=listing_page_size, chart_backend='svg', executor=None):
+    """
+    Regenerates the static website given an already imported set of entries, inspirations and developers.
     These datasets must be valid for each other, i.e. each inspiration listed in entries must also have an
     entry in inspirations and the same holds for developers.
+
+    All pages are collected first (with their context already converted, which is most of the time of a build) and
+    then only those whose digest (see page_digest) is not the one in the build manifest are rendered (in parallel
+    processes if parallel is True, in those of executor if given) and written (see OutputOptions).
+    Letters with more than page_size developers or inspirations are split into multiple pages. The charts of the
+    statistics are written by chart_backend (see stat.chart_backends). Style sheets and scripts are referenced by
+    their names in assets (name -> fingerprinted name, see sync_assets).
     """
 
+    # digest of the templates and the generator
+    build = build_digest()
+
     # split entries in games and non-games
     games, non_games = [], []
     for entry in entries:
@@ -958,8 +1452,8 @@ def generate(entries, inspirations, developers):
         keyword = [keyword for keyword in c.non_game_keywords if keyword in non_game['Keyword']][0]
         non_game['href'] = non_games_path + ['{}.html#{}'.format(keyword, non_game['anchor-id'])]
     entries = games + non_games
-    preprocess(inspirations, 'Name', inspirations_path)
-    preprocess(developers, 'Name', developers_path)
+    preprocess(inspirations, 'Name', inspirations_path, page_size)
+    preprocess(developers, 'Name', developers_path, page_size)
 
     # set internal links up
     convert_inspirations(inspirations, entries)
@@ -968,7 +1462,10 @@ def generate(entries, inspirations, developers):
     convert_entries(non_games, inspirations, developers)
 
     # create entries.json for the table
-    create_table_json_data(entries)
+    create_table_json_data(entries, manifest)
+
+    # create the search index
+    create_search_index(entries, manifest)
 
     # create statistics data
     statistics_data = {
@@ -977,105 +1474,83 @@ def generate(entries, inspirations, developers):
     }
 
     # supported platforms
-    section = create_statistics_section(entries, 'Platform', 'Supported platforms', 'supported_platforms.svg', partial(stat.export_bar_chart, aspect_ratio=0.7, tick_label_rotation=45))
+    section = create_statistics_section(entries, 'Platform', 'Supported platforms', 'supported_platforms.svg', partial(stat.export_bar_chart, aspect_ratio=0.7, tick_label_rotation=45), manifest, build, chart_backend=chart_backend)
     statistics_data['sections'].append(section)
 
     # code languages
-    section = create_statistics_section(entries, 'Code language', 'Code languages', 'code_languages.svg', partial(stat.export_bar_chart, aspect_ratio=1.5, tick_label_rotation=45))
+    section = create_statistics_section(entries, 'Code language', 'Code languages', 'code_languages.svg', partial(stat.export_bar_chart, aspect_ratio=1.5, tick_label_rotation=45), manifest, build, chart_backend=chart_backend)
     statistics_data['sections'].append(section)
 
     # code license
-    section = create_statistics_section(entries, 'Code license', 'Code licenses', 'code_licenses.svg', partial(stat.export_bar_chart, aspect_ratio=1.5, tick_label_rotation=45))
+    section = create_statistics_section(entries, 'Code license', 'Code licenses', 'code_licenses.svg', partial(stat.export_bar_chart, aspect_ratio=1.5, tick_label_rotation=45), manifest, build, chart_backend=chart_backend)
     statistics_data['sections'].append(section)
 
     # code dependencies
-    section = create_statistics_section(entries, 'Code dependency', 'Code dependencies', 'code_dependencies.svg', partial(stat.export_bar_chart, aspect_ratio=1.5, tick_label_rotation=45))
+    section = create_statistics_section(entries, 'Code dependency', 'Code dependencies', 'code_dependencies.svg', partial(stat.export_bar_chart, aspect_ratio=1.5, tick_label_rotation=45), manifest, build, chart_backend=chart_backend)
     statistics_data['sections'].append(section)
 
     # build-systems
-    section = create_statistics_section(entries, 'Build system', 'Build systems', 'build_systems.svg', stat.export_pie_chart, sub_field='Building')
+    section = create_statistics_section(entries, 'Build system', 'Build systems', 'build_systems.svg', stat.export_pie_chart, manifest, build, sub_field='Building', chart_backend=chart_backend)
     statistics_data['sections'].append(section)
 
     # set external links up (statistics and entries.json doesn't work anymore beyond that point)
     add_license_links_to_entries(entries)
 
     # sort into categories
-    sorter = lambda item, category: category == item['letter']
-    games_by_alphabet = sort_into_categories(games, extended_alphabet, sorter)
-    inspirations_by_alphabet = sort_into_categories(inspirations, extended_alphabet, sorter)
-    developers_by_alphabet = sort_into_categories(developers, extended_alphabet, sorter)
+    letter = lambda item: (item['letter'],)
+    games_by_alphabet = sort_into_categories(games, extended_alphabet, letter)
+    inspirations_by_alphabet = sort_into_categories(inspirations, extended_alphabet, letter)
+    developers_by_alphabet = sort_into_categories(developers, extended_alphabet, letter)
 
+    # the other categories from the inverted indexes
+    games_database, entries_database, non_games_database = osg.Database(games), osg.Database(entries), osg.Database(non_games)
     genres = [keyword.capitalize() for keyword in c.recommended_keywords if keyword not in c.non_game_keywords]
     genres.sort()
-    games_by_genre = sort_into_categories(games, genres, lambda item, category: category.lower() in item['Keyword'])
-    games_by_platform = sort_into_categories(entries, c.valid_platforms, lambda item, category: category in item.get('Platform', []), 'Unspecified')
-    games_by_language = sort_into_categories(entries, c.known_languages, lambda item, category: category in item['Code language'])
-    non_games_by_type = sort_into_categories(non_games, c.non_game_keywords, lambda item, category: category in item['Keyword'])
+    games_by_genre = {genre: games_database.entries_with('Keyword', genre.lower()) for genre in genres}
+    games_by_platform = {platform: entries_database.entries_with('Platform', platform) for platform in c.valid_platforms}
+    games_by_platform['Unspecified'] = [entry for entry in entries if not entry.get('Platform')]
+    games_by_language = {language: entries_database.entries_with('Code language', language) for language in c.known_languages}
+    non_games_by_type = {keyword: non_games_database.entries_with('Keyword', keyword) for keyword in c.non_game_keywords}
 
     # extract top 50 Github stars games
     top50_games = get_top50_games(games)
 
-    # base dictionary
-    base = {
-        'title': 'OSGL',
+    # common to all pages
+    site = {
         'creation-date': datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%d %H:%M'),
-        'css': ['bulma.min.css', 'osgl.min.css'],
-        'js': ['osgl.js']
+        'css': [assets['bulma.min.css'], assets['osgl.min.css']],
+        'js': [assets['osgl.js']]
     }
 
-    # copy css and js
-    utils.copy_tree(os.path.join(c.web_template_path, 'css'), c.web_css_path)
-    utils.copy_tree(os.path.join(c.web_template_path, 'js'), c.web_js_path)
-
-    # copy screenshots path
-    files = [file for file in os.listdir(c.screenshots_path) if file.endswith('.jpg')]
-    os.makedirs(c.web_screenshots_path, exist_ok=True)
-    for file in files:
-        shutil.copyfile(os.path.join(c.screenshots_path, file), os.path.join(c.web_screenshots_path, file))
-
-    # collage_image and google search console token and favicon.svg
-    for file in ('collage_games.jpg', 'google1f8a3863114cbcb3.html', 'favicon.svg'):
-        shutil.copyfile(os.path.join(c.web_template_path, file), os.path.join(c.web_path, file))
-
-    # create Jinja Environment
-    environment = Environment(loader=FileSystemLoader(c.web_template_path), autoescape=True)
-    environment.globals['base'] = base
-    environment.globals['raise'] = raise_helper
-    environment.globals['is_list'] = lambda obj: isinstance(obj, list)
+    # all the pages
+    pages = []
 
     # multiple times used templates
-    template_categorical_index = environment.get_template('categorical_index.jinja')
-    template_listing_entries = environment.get_template('listing_entries.jinja')
+    template_categorical_index = 'categorical_index.jinja'
+    template_listing_entries = 'listing_entries.jinja'
 
-    # top level folder
-    base['url_to'] = partial(url_to, [])
+    title = 'OSGL'
 
     # index.html
-    base['active_nav'] = 'index'
+    active_nav = 'index'
     index = {'subtitle': make_text('Contains information about {} open source games and {} game engines/tools.'.format(len(games), len(non_games))) }
-    template = environment.get_template('index.jinja')
-    write(template.render(index=index), ['index.html'])
+    pages.append(make_page(site, ['index.html'], 'index.jinja', title, active_nav, index=index))
 
     # contribute page
-    base['title'] = 'OSGL | Contributions'
-    base['active_nav'] = 'contribute'
-    template = environment.get_template('contribute.jinja')
-    write(template.render(), ['contribute.html'])
+    title = 'OSGL | Contributions'
+    active_nav = 'contribute'
+    pages.append(make_page(site, ['contribute.html'], 'contribute.jinja', title, active_nav))
 
     # statistics page in statistics folder
-    base['title'] = 'OSGL | Statistics'
-    base['url_to'] = partial(url_to, statistics_path)
-    base['active_nav'] = 'statistics'
+    title = 'OSGL | Statistics'
+    active_nav = 'statistics'
 
-    # statistics preparation
-    template = environment.get_template('statistics.jinja')
-    # render and write statistics page
-    write(template.render(data=statistics_data), statistics_index_path)
+    # statistics page
+    pages.append(make_page(site, statistics_index_path, 'statistics.jinja', title, active_nav, data=statistics_data))
 
     # non-games folder
-    base['title'] = 'OSGL | Game engines, frameworks, tools'
-    base['url_to'] = partial(url_to, non_games_path)
-    base['active_nav'] = 'frameworks'
+    title = 'OSGL | Game engines, frameworks, tools'
+    active_nav = 'frameworks'
 
     # non-games by type
     index = divide_in_three_columns_and_transform(non_games_by_type, entry_index)
@@ -1086,7 +1561,7 @@ def generate(entries, inspirations, developers):
     index['category-icons'] = {}
     index['number_entries_per_category_threshold'] = 0
     index['category-infos'] = {}
-    write(template_categorical_index.render(index=index), non_games_index_path)
+    pages.append(make_page(site, non_games_index_path, template_categorical_index, title, active_nav, input_ids('entry', non_games), index=index))
 
     # generate non-games pages
     for keyword in c.non_game_keywords:
@@ -1095,12 +1570,11 @@ def generate(entries, inspirations, developers):
             'subtitle': make_url(non_games_index_path, 'Index'),
             'items': non_games_by_type[keyword]
         }
-        write(template_listing_entries.render(listing=listing), non_games_path + ['{}.html'.format(keyword)])
+        pages.append(make_page(site, non_games_path + ['{}.html'.format(keyword)], template_listing_entries, title, active_nav, input_ids('entry', listing['items']), listing=listing))
 
     # games folder
-    base['title'] = 'OSGL | Games | Alphabetical'
-    base['url_to'] = partial(url_to, games_path)
-    base['active_nav'] = 'games'
+    title = 'OSGL | Games | Alphabetical'
+    active_nav = 'games'
 
     # generate games pages
     for letter in extended_alphabet:
@@ -1108,7 +1582,7 @@ def generate(entries, inspirations, developers):
             'title': 'Games starting with {}'.format(letter.capitalize()),
             'items': games_by_alphabet[letter]
         }
-        write(template_listing_entries.render(listing=listing), games_path + ['{}.html'.format(letter.capitalize())])
+        pages.append(make_page(site, games_path + ['{}.html'.format(letter.capitalize())], template_listing_entries, title, active_nav, input_ids('entry', listing['items']), listing=listing))
 
     # generate games index
     index = divide_in_three_columns_and_transform(games_by_alphabet, entry_index)
@@ -1119,11 +1593,11 @@ def generate(entries, inspirations, developers):
     index['category-icons'] = {}
     index['number_entries_per_category_threshold'] = 20
     index['category-infos'] = {letter: make_text('{} games'.format(len(games_by_alphabet[letter]))) for letter in extended_alphabet}
-    write(template_categorical_index.render(index=index), games_index_path)
+    pages.append(make_page(site, games_index_path, template_categorical_index, title, active_nav, input_ids('entry', games), index=index))
 
     # genres
-    base['title'] = 'OSGL | Games | Genres'
-    base['active_nav'] = ['filter', 'genres']
+    title = 'OSGL | Games | Genres'
+    active_nav = ['filter', 'genres']
     index = divide_in_three_columns_and_transform(games_by_genre, entry_index)
     index['title'] = make_text('Open source games')
     index['subtitle'] = [make_text('Index by game genre.')]
@@ -1132,11 +1606,11 @@ def generate(entries, inspirations, developers):
     index['category-icons'] = {k: make_icon(genre_icon_map[k]) for k in index['categories'] if k in genre_icon_map}
     index['number_entries_per_category_threshold'] = 50
     index['category-infos'] = {genre: make_text('{} games'.format(len(games_by_genre[genre]))) for genre in genres}
-    write(template_categorical_index.render(index=index), games_by_genres_path)
+    pages.append(make_page(site, games_by_genres_path, template_categorical_index, title, active_nav, input_ids('entry', games), index=index))
 
     # games by language
-    base['title'] = 'OSGL | Games | Programming language'
-    base['active_nav'] = ['filter', 'code language']
+    title = 'OSGL | Games | Programming language'
+    active_nav = ['filter', 'code language']
     index = divide_in_three_columns_and_transform(games_by_language, entry_index)
     index['title'] = 'Open source games and frameworks'
     index['subtitle'] = [make_text('Index by programming language.')]
@@ -1145,11 +1619,11 @@ def generate(entries, inspirations, developers):
     index['category-icons'] = {}
     index['number_entries_per_category_threshold'] = 15
     index['category-infos'] = {category: make_url(c.language_urls[category], 'Language information', css_class='is-size-7') for category in c.known_languages if category in c.language_urls}
-    write(template_categorical_index.render(index=index), games_by_language_path)
+    pages.append(make_page(site, games_by_language_path, template_categorical_index, title, active_nav, input_ids('entry', entries), index=index))
 
     # games by platform
-    base['title'] = 'OSGL | Games | Supported Platform'
-    base['active_nav'] = ['filter', 'platforms']
+    title = 'OSGL | Games | Supported Platform'
+    active_nav = ['filter', 'platforms']
     index = divide_in_three_columns_and_transform(games_by_platform, entry_index)
     index['title'] = 'Open source games and frameworks'
     index['subtitle'] = [make_text('Index by supported platform.')]
@@ -1159,164 +1633,326 @@ def generate(entries, inspirations, developers):
     index['number_entries_per_category_threshold'] = 15
     index['category-infos'] = {}
     index['category-infos'] = {category: make_text('{} entries'.format(len(games_by_platform[category]))) for category in index['categories']}
-    write(template_categorical_index.render(index=index), games_by_platform_path)
+    pages.append(make_page(site, games_by_platform_path, template_categorical_index, title, active_nav, input_ids('entry', entries), index=index))
 
     # for kids games
-    base['title'] = 'OSGL | Games | For Kids'
-    base['active_nav'] = ['filter', 'kids']
+    title = 'OSGL | Games | For Kids'
+    active_nav = ['filter', 'kids']
     kids_games = [game for game in games if 'for kids' in game['Keyword']]
     listing = {
         'title': 'Games for Kids',
         'subtitle': '{} games suitable for kids.'.format(len(kids_games)),
         'items': kids_games
     }
-    write(template_listing_entries.render(listing=listing), games_kids_path)
+    pages.append(make_page(site, games_kids_path, template_listing_entries, title, active_nav, input_ids('entry', kids_games), listing=listing))
 
     # playable in browser
-    base['title'] = 'OSGL | Games | Web play'
-    base['active_nav'] = ['filter', 'web']
+    title = 'OSGL | Games | Web play'
+    active_nav = ['filter', 'web']
     web_games = [game for game in games if 'Play' in game and 'Web' in game['Platform']]
     listing = {
         'title': 'Playable browser games',
         'subtitle': '{} games that can be played in your browser right away.'.format(len(web_games)),
         'items': web_games
     }
-    write(template_listing_entries.render(listing=listing), games_web_path)
+    pages.append(make_page(site, games_web_path, template_listing_entries, title, active_nav, input_ids('entry', web_games), listing=listing))
 
     # completely free games
-    base['title'] = 'OSGL | Games | Free code and artwork'
-    base['active_nav'] = ['filter', 'libre']
+    title = 'OSGL | Games | Free code and artwork'
+    active_nav = ['filter', 'libre']
     libre_games = [game for game in games if 'content open' in game['Keyword']]
     listing = {
         'title': 'Completely free games',
         'subtitle': '{} games with open/libre code and artwork.'.format(len(libre_games)),
         'items': libre_games
     }
-    write(template_listing_entries.render(listing=listing), games_libre_path)
+    pages.append(make_page(site, games_libre_path, template_listing_entries, title, active_nav, input_ids('entry', libre_games), listing=listing))
 
     # top 50 github games
-    base['title'] = 'OSGL | Games | GitHub Top 50'
-    base['active_nav'] = ['filter', 'top50']
-    # there are no other games coming afterwards, can actually number them
-    for index, game in enumerate(top50_games):
-        game['name'] = '{}. '.format(index+1) + game['name']
+    title = 'OSGL | Games | GitHub Top 50'
+    active_nav = ['filter', 'top50']
+    # numbered, on copies because the same games are shown on other pages too
+    top50_items = [dict(game, name='{}. '.format(index+1) + game['name']) for index, game in enumerate(top50_games)]
     listing = {
         'title': 'GitHub Stars Top 50',
         'subtitle': '50 highest rated (by stars on Github) playable open source games in the database', # that can be played online or downloaded
-        'items': top50_games
+        'items': top50_items
     }
-    write(template_listing_entries.render(listing=listing), games_top50_path)
+    pages.append(make_page(site, games_top50_path, template_listing_entries, title, active_nav, input_ids('entry', top50_games), listing=listing))
 
     # inspirations folder
-    base['title'] = 'OSGL | Inspirational games'
-    base['url_to'] = partial(url_to, inspirations_path)
-    base['active_nav'] = 'inspirations'
+    title = 'OSGL | Inspirational games'
+    active_nav = 'inspirations'
 
     # inspirations
 
-    # inspirations single pages
-    template_listing_inspirations = environment.get_template('listing_inspirations.jinja')
-    for letter in extended_alphabet:
-        listing = {
-            'title': 'Inspirations ({})'.format(letter.capitalize()),
-            'items': inspirations_by_alphabet[letter]
-        }
-        write(template_listing_inspirations.render(listing=listing), inspirations_path + ['{}.html'.format(letter.capitalize())])
+    # inspirations single pages (large letters on multiple pages)
+    inspirations_pages = {letter: paginate(letter, inspirations_by_alphabet[letter]) for letter in extended_alphabet}
+    for letter, letter_pages in inspirations_pages.items():
+        for index, (name, items) in enumerate(letter_pages):
+            listing = {
+                'title': 'Inspirations ({})'.format(letter.capitalize()),
+                'items': items
+            }
+            if len(letter_pages) > 1:
+                listing['title'] = 'Inspirations ({}, page {} of {})'.format(letter.capitalize(), index + 1, len(letter_pages))
+                listing['subtitle'] = make_pager(inspirations_path, letter_pages, index)
+            pages.append(make_page(site, inspirations_path + ['{}.html'.format(name.capitalize())], 'listing_inspirations.jinja', title, active_nav, input_ids('inspiration', listing['items']), listing=listing))
 
     # inspirations index
-    extended_alphabet_names['_'] = 'Most used'
     top_inspirations = [inspiration for inspiration in inspirations if len(inspiration['Inspired entries']) >= TOP_INSPIRATION_THRESHOLD]
     inspirations_by_alphabet['_'] = top_inspirations
     index = divide_in_three_columns_and_transform(inspirations_by_alphabet, inspiration_index)
     index['title'] = 'Inspirations'
     index['subtitle'] = make_text('Alphabetical index of {} games used as inspirations'.format(len(inspirations)))
     index['categories'] = '_' + extended_alphabet
-    index['category-names'] = extended_alphabet_names
+    index['category-names'] = dict(extended_alphabet_names, _='Most used')
     index['category-icons'] = {}
     index['number_entries_per_category_threshold'] = 10
-    index['category-infos'] = {}
-    write(template_categorical_index.render(index=index), inspirations_index_path)
+    index['category-infos'] = {letter: make_pager(inspirations_path, letter_pages, None) for letter, letter_pages in inspirations_pages.items() if len(letter_pages) > 1}
+    pages.append(make_page(site, inspirations_index_path, template_categorical_index, title, active_nav, input_ids('inspiration', inspirations), index=index))
 
     # developers folder
-    base['title'] = 'OSGL | Games | Developers'
-    base['url_to'] = partial(url_to, developers_path)
-    base['active_nav'] = 'developers'
-
-    # developers single pages
-    template_listing_developers = environment.get_template('listing_developers.jinja')
-    for letter in extended_alphabet:
-        listing = {
-            'title': 'Open source game developers ({})'.format(letter.capitalize()),
-            'items': developers_by_alphabet[letter]
-        }
-        write(template_listing_developers.render(listing=listing), developers_path + ['{}.html'.format(letter.capitalize())])
+    title = 'OSGL | Games | Developers'
+    active_nav = 'developers'
+
+    # developers single pages (large letters on multiple pages)
+    developers_pages = {letter: paginate(letter, developers_by_alphabet[letter]) for letter in extended_alphabet}
+    for letter, letter_pages in developers_pages.items():
+        for index, (name, items) in enumerate(letter_pages):
+            listing = {
+                'title': 'Open source game developers ({})'.format(letter.capitalize()),
+                'items': items
+            }
+            if len(letter_pages) > 1:
+                listing['title'] = 'Open source game developers ({}, page {} of {})'.format(letter.capitalize(), index + 1, len(letter_pages))
+                listing['subtitle'] = make_pager(developers_path, letter_pages, index)
+            pages.append(make_page(site, developers_path + ['{}.html'.format(name.capitalize())], 'listing_developers.jinja', title, active_nav, input_ids('developer', listing['items']), listing=listing))
 
     # developers index
-    extended_alphabet_names['_'] = 'Most active'
     top_developers = [developer for developer in developers if len(developer['Games']) >= TOP_DEVELOPER_THRESHOLD]
     developers_by_alphabet['_'] = top_developers
     index = divide_in_three_columns_and_transform(developers_by_alphabet, developer_index)
     index['title'] = 'Open source game developers'
     index['subtitle'] = make_text('Alphabetical index of {} developers'.format(len(developers)))
     index['categories'] = '_' + extended_alphabet
-    index['category-names'] = extended_alphabet_names
+    index['category-names'] = dict(extended_alphabet_names, _='Most active')
     index['category-icons'] = {}
     index['number_entries_per_category_threshold'] = 10
-    index['category-infos'] = {}
-    write(template_categorical_index.render(index=index), developers_index_path)
+    index['category-infos'] = {letter: make_pager(developers_path, letter_pages, None) for letter, letter_pages in developers_pages.items() if len(letter_pages) > 1}
+    pages.append(make_page(site, developers_index_path, template_categorical_index, title, active_nav, input_ids('developer', developers), index=index))
 
     # dynamic table (is in top level folder)
-    base['title'] = 'OSGL | Entries | Table'
-    base['url_to'] = partial(url_to, [])
-    base['css'].append('simple-datatables.css')
-    base['js'].append('simple-datatables.js')
-    base['active_nav'] = 'table'
-    template = environment.get_template('table.jinja')
-    index['tags'] = make_text(', '.join(c.interesting_keywords))
-    index['platforms'] = make_text(', '.join(c.valid_platforms))
-    write(template.render(index=index), ['table.html'])
+    title = 'OSGL | Entries | Table'
+    active_nav = 'table'
+    index = {
+        'tags': make_text(', '.join(c.interesting_keywords)),
+        'platforms': make_text(', '.join(c.valid_platforms))
+    }
+    pages.append(make_page(site, ['table.html'], 'table.jinja', title, active_nav, css=[assets['simple-datatables.css']], js=[assets['simple-datatables.js']], index=index))
 
+    # render and write those pages that are not up to date
+    render_pages(pages, manifest, build, parallel, options, executor=executor)
 
-if __name__ == "__main__":
 
-    start_time = time.process_time()
+def build(database, args, executor=None):
+    """
+    Brings the website in the output directory up to date with the database (see generate) and removes outputs that
+    are not produced anymore. The database itself is not changed, the website is generated from copies of the
+    entries, developers and inspirations.
+    :param args: The parsed command line arguments
+    :param executor: Pool of renderer processes kept for multiple builds (see renderer_pool), or None
+    """
+    # the output directory is kept, new or changed outputs are staged and moved into it at the end (the manifest is
+    # locked for the whole build, so other builds wait)
+    os.makedirs(c.web_path, exist_ok=True)
+    with website.BuildManifest(c.website_manifest_file, c.web_path, rebuild=args.full) as manifest:
+        # sort entries alphabetically
+        entries = [type(entry)(entry) for entry in database.entries]
+        entries.sort(key=lambda x: str.casefold(x['Title']))
+
+        # add screenshot information
+        add_screenshot_information(entries)
+
+        # remove orphaned inspirations for the website creation
+        inspirations = [type(inspiration)(inspiration) for inspiration in database.inspirations.values() if inspiration['Inspired entries']]
+        inspirations.sort(key=lambda x: str.casefold(x['Name']))
+
+        # remove orphaned developers for the website creation
+        developers = [type(developer)(developer) for developer in database.developers.values() if developer['Games']]
+        developers.sort(key=lambda x: str.casefold(x['Name']))
+
+        # re-generate static website
+        print('re-generate static website')
+        classes = used_classes()
+        assets = sync_assets(manifest, classes, args.assets)
+        options = OutputOptions(args.validation, not args.no_minify, args.compress)
+        generate(entries, inspirations, developers, manifest, assets, parallel=not args.serial, options=options, page_size=args.page_size, chart_backend=args.charts, executor=executor)
+        check_used_classes(manifest, classes)
+
+        # move the new outputs in place, remove outputs that are not produced anymore and store the manifest for the next build
+        print('{} files updated'.format(manifest.commit()))
+        for path in manifest.remove_stale(generated_directories):
+            print('removed {}'.format(path))
+        manifest.save()
+
+
+def source_files():
+    """
+    The sources of the website (entries, developers, inspirations, the screenshots overview and everything in the
+    template directory including this generator) with their size and modification time.
+    :return: Dictionary file -> (size, modification time)
+    """
+    files = [entry.path for entry in os.scandir(c.entries_path) if entry.is_file()]
+    files.extend((c.developer_file, c.inspirations_file, c.screenshots_file))
+    for dirpath, dirnames, filenames in os.walk(c.web_template_path):
+        dirnames[:] = [directory for directory in dirnames if directory != '__pycache__']
+        files.extend(os.path.join(dirpath, file) for file in filenames)
+    sources = {}
+    for file in files:
+        try:
+            s = os.stat(file)
+        except OSError:
+            continue  # deleted in between
+        sources[file] = (s.st_size, s.st_mtime_ns)
+    return sources
 
-    # create dictionary of file hashes
-    print('estimate file hashes')
-    for dirpath, dirnames, filenames in os.walk(c.web_path):
-        for file in filenames:
-            if any(file.endswith(ext) for ext in ('.html', '.svg')):
-                file = os.path.join(dirpath, file)
-                text = utils.read_text(file)
-                previous_files[file] = {'hash': file_hash(text), 'text': text}
 
-    # clean the output directory
-    print('clean current static website')
-    utils.recreate_directory(c.web_path)
+def update_database(database, changed):
+    """
+    Parses changed (or new) entries, developers and inspirations again and removes deleted entries. Files that cannot
+    be read are skipped, the database keeps their previous version.
+    :param changed: Changed source files (see source_files)
+    :return: Dictionary file -> error of the files that could not be read
+    """
+    entries = {entry['File']: entry for entry in database.entries}
+    developers, inspirations = database.developers, database.inspirations
+    failed = {}
+    for file in changed:
+        try:
+            if os.path.dirname(file) == c.entries_path:
+                name = os.path.basename(file)
+                if os.path.isfile(file):
+                    entries[name] = osg.read_entry(name)
+                else:
+                    entries.pop(name, None)
+            elif file == c.developer_file:
+                developers = osg.read_developers()
+            elif file == c.inspirations_file:
+                inspirations = osg.read_inspirations()
+        except Exception as e:
+            failed[file] = e
+    database.entries = list(entries.values())
+    database.developers = developers
+    database.inspirations = inspirations
+    database.reindex()
+    return failed
 
-    # load entries, inspirations and developers and sort them alphabetically
-    print('load entries, inspirations and developers')
-    entries = osg.read_entries()
-    entries.sort(key=lambda x: str.casefold(x['Title']))
 
-    # add screenshot information
-    add_screenshot_information(entries)
+def watch(database, args, sources, executor=None):
+    """
+    Keeps the database and the Jinja environment in memory and builds the website again whenever the sources change
+    (see source_files). Only changed files are parsed again and only the affected pages are rendered again (see
+    build manifest). Files that cannot be read are reported and read again once they change again, the other changes
+    are built anyway. If the generator itself changes, it is restarted. Runs until interrupted.
+    :param args: The parsed command line arguments, if args.serve is a port, the output directory is also served
+    :param sources: The sources the database was read from (see source_files)
+    :param executor: Pool of renderer processes (with their Jinja environments) used for all builds (shut down at the
+    end), or None
+    """
+    if args.serve:
+        handler = partial(http.server.SimpleHTTPRequestHandler, directory=c.web_path)
+        server = http.server.ThreadingHTTPServer(('localhost', args.serve), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print('serving {} at http://localhost:{}/'.format(c.web_path, args.serve))
+    args.full = False  # only the first build
+    generator = os.path.realpath(__file__)
+    failed = {}  # files that could not be read -> their size and modification time then
+    retry = False  # build again even without changes
+    print('watching for changes (stop with Ctrl+C)')
+    try:
+        while True:
+            time.sleep(watch_interval)
+            current = source_files()
+            # files that could not be read are only read again once they change again
+            changed = sorted(file for file in current.keys() | sources.keys() if current.get(file) != sources.get(file) and (file not in failed or current.get(file) != failed[file]))
+            if not changed and not retry:
+                continue
+            retry = False
+            if changed:
+                print('changed: {}'.format(', '.join(os.path.relpath(file, c.root_path) for file in changed)))
+            if generator in changed:
+                print('generator changed, restarting')
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
+                os.execv(sys.executable, [sys.executable] + sys.argv)
+            start_time = time.perf_counter()
+
+            # only the files that could be read are taken as seen, the others stay changed
+            errors = update_database(database, changed)
+            for file in changed:
+                if file in errors:
+                    failed[file] = current.get(file)
+                    print('could not read {}: {}'.format(os.path.relpath(file, c.root_path), errors[file]))
+                    continue
+                failed.pop(file, None)
+                if file in current:
+                    sources[file] = current[file]
+                else:
+                    sources.pop(file, None)
+
+            # the database contains all changes read so far, so a later build includes those of a failed one
+            try:
+                build(database, args, executor)
+            except concurrent.futures.BrokenExecutor as e:
+                # a renderer process died, build again with new ones
+                print('build failed: {}'.format(e))
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor = renderer_pool(build_digest())
+                retry = True
+                continue
+            except Exception as e:
+                # the output directory is unchanged, try again with the next change
+                print('build failed: {}'.format(e))
+                continue
+            print('took {:.3f}s'.format(time.perf_counter() - start_time))
+    except KeyboardInterrupt:
+        print('stopped watching')
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
 
-    inspirations = osg.read_inspirations()
-    inspirations = list(inspirations.values())
-    inspirations.sort(key=lambda x: str.casefold(x['Name']))
-    # remove orphaned inspirations for the website creation
-    inspirations = [inspiration for inspiration in inspirations if inspiration['Inspired entries']]
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Generates the static website (only the pages that changed since the last build).')
+    parser.add_argument('--full', action='store_true', help='render all pages, even those that are up to date')
+    parser.add_argument('--serial', action='store_true', help='render the pages in this process only')
+    parser.add_argument('--validation', choices=validation_modes, default='full' if os.environ.get('CI') else 'fast', help='validation of the pages, fast (only structure) or full (html5lib, default in CI)')
+    parser.add_argument('--no-minify', action='store_true', help='do not minify the pages (readable html)')
+    parser.add_argument('--compress', action='store_true', help='also write precompressed pages (.gz and .br if brotli is installed)')
+    parser.add_argument('--page-size', type=int, default=listing_page_size, help='maximal number of developers or inspirations per page, 0 for no limit (default: {})'.format(listing_page_size))
+    parser.add_argument('--charts', choices=stat.chart_backends, default='svg', help='how to draw the charts of the statistics, directly as svg or with matplotlib (default: svg)')
+    parser.add_argument('--assets', choices=('copy', 'hardlink', 'reflink'), default='copy', help='how to place css, js and screenshots (default: copy)')
+    parser.add_argument('--watch', action='store_true', help='keep running and build again whenever entries, developers, inspirations or templates change')
+    parser.add_argument('--serve', type=int, nargs='?', const=8000, metavar='PORT', help='with --watch, also serve the website locally (default port: 8000)')
+    args = parser.parse_args()
+    if args.serve and not args.watch:
+        parser.error('--serve needs --watch')
 
-    developers = osg.read_developers()
-    developers = list(developers.values())
-    developers.sort(key=lambda x: str.casefold(x['Name']))
-    # remove orphaned developers for the website creation
-    developers = [developer for developer in developers if developer['Games']]
+    start_time = time.process_time()
+
+    # load entries, inspirations and developers (changes from now on are seen in watch mode)
+    sources = source_files() if args.watch else None
+    print('load entries, inspirations and developers')
+    database = osg.Database.read(parallel=True)
 
-    # re-generate static website
-    print('re-generate static website')
-    generate(entries, inspirations, developers)
+    # in watch mode, the renderer processes are kept for all builds (and keep their Jinja environments)
+    executor = renderer_pool(build_digest()) if args.watch and not args.serial else None
+    build(database, args, executor)
+    if args.watch:
+        watch(database, args, sources, executor)
+    cache.DiskCache(c.website_fragments_path, c.website_fragments_max_size).trim()
 
     # timing
-    print('took {:.3f}s'.format(time.process_time()-start_time))
\ No newline at end of file
+    print('took {:.3f}s'.format(time.process_time()-start_time))
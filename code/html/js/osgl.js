@@ -26,4 +26,71 @@ document.addEventListener('DOMContentLoaded', () => {
     });
   }
 
+  // Search in the prebuilt index (data/search, sharded by the first two characters of the terms)
+  const $search = document.getElementById('search');
+  if ($search) {
+    const $input = $search.querySelector('input');
+    const $results = document.getElementById('search-results');
+    const index = new URL($input.dataset.index + '/', document.baseURI);
+    const root = new URL($input.dataset.root, document.baseURI);
+    const shards = {};
+    let latest = 0;
+
+    // the same normalization as in the generator (lower case, no diacritics, words of at least two characters or
+    // all words joined if there are only single characters)
+    const words = text => {
+      const all = text.toLowerCase().normalize('NFKD').replace(/\p{M}/gu, '').match(/[\p{L}\p{N}]+/gu) || [];
+      const long = all.filter(word => Array.from(word).length > 1);
+      return long.length > 0 ? long : (all.length > 1 ? [all.join('')] : []);
+    };
+    const shardName = word => Array.from(word).slice(0, 2).join('').replace(/[^a-z0-9]/g, '_');
+
+    // loads a shard only once, missing shards are empty
+    const load = name => {
+      if (!(name in shards)) {
+        shards[name] = fetch(new URL(name + '.json', index))
+          .then(response => response.ok ? response.json() : {documents: [], terms: {}})
+          .catch(() => ({documents: [], terms: {}}));
+      }
+      return shards[name];
+    };
+
+    // all documents (url -> title) with a term starting with the word
+    const find = word => load(shardName(word)).then(shard => {
+      const found = new Map();
+      for (const [term, documents] of Object.entries(shard.terms)) {
+        if (term.startsWith(word)) {
+          documents.forEach(i => found.set(shard.documents[i][1], shard.documents[i][0]));
+        }
+      }
+      return found;
+    });
+
+    $input.addEventListener('input', () => {
+      const search = ++latest;
+      Promise.all(words($input.value).map(find)).then(found => {
+        if (search !== latest) {
+          return;  // a newer search is running
+        }
+        // documents found for all words
+        let results = found.length > 0 ? Array.from(found[0]).filter(([url]) => found.every(f => f.has(url))) : [];
+        results.sort((a, b) => a[1].localeCompare(b[1]));
+        $results.replaceChildren(...results.slice(0, 20).map(([url, title]) => {
+          const $a = document.createElement('a');
+          $a.className = 'navbar-item';
+          $a.href = new URL(url, root).href;
+          $a.textContent = title;
+          return $a;
+        }));
+        if (results.length > 20) {
+          const $more = document.createElement('div');
+          $more.className = 'navbar-item is-size-7';
+          $more.textContent = 'and ' + (results.length - 20) + ' more';
+          $results.append($more);
+        }
+        $search.classList.toggle('is-active', results.length > 0);
+      });
+    });
+  }
+
 });
\ No newline at end of file
@@ -29,8 +29,10 @@ class DevelopersMaintainer:
         if not self.developers:
             print('developers not yet loaded')
             return
-        osg.write_developers(self.developers)
-        print('{} developers written'.format(len(self.developers)))
+        if osg.write_developers(self.developers):
+            print('{} developers written'.format(len(self.developers)))
+        else:
+            print('developers unchanged')
 
     def check_for_duplicates(self):
         if not self.developers:
@@ -73,10 +75,11 @@ class DevelopersMaintainer:
         if not self.entries:
             print('entries not yet loaded')
             return
+        database = osg.Database(self.entries, self.developers)
         for dev in self.developers.values():
             dev_name = dev['Name']
             for entry_name in dev['Games']:
-                x = [x for x in self.entries if x['Title'] == entry_name]
+                x = database.entries_with('Title', entry_name)
                 assert len(x) <= 1
                 if not x:
                     print('Entry "{}" listed as game of developer "{}" but this entry does not exist'.format(entry_name, dev_name))
@@ -113,8 +113,12 @@ class EntriesMaintainer:
             print('entries not yet loaded')
             return
         osg.write_entries(self.entries)
-        print('entries written')
 
+    def check_fast_entry_parser(self):
+        """
+        Compares the results of the fast entry parser with the Lark parser for all entries.
+        """
+        osg.check_fast_entry_parser()
 
     def check_template_leftovers(self):
         """
@@ -435,10 +439,11 @@ class EntriesMaintainer:
         tocs_text = ''
 
         # split into games, tools, frameworks, libraries
+        database = osg.Database(self.entries)
         games = [x for x in self.entries if not any([y in x['Keyword'] for y in ('tool', 'framework', 'library')])]
-        tools = [x for x in self.entries if 'tool' in x['Keyword']]
-        frameworks = [x for x in self.entries if 'framework' in x['Keyword']]
-        libraries = [x for x in self.entries if 'library' in x['Keyword']]
+        tools = database.entries_with('Keyword', 'tool')
+        frameworks = database.entries_with('Keyword', 'framework')
+        libraries = database.entries_with('Keyword', 'library')
         
         # create games, tools, frameworks, libraries tocs
         title = 'Games'
@@ -464,7 +469,7 @@ class EntriesMaintainer:
         # create by category
         categories_text = []
         for keyword in c.recommended_keywords:
-            filtered = [x for x in self.entries if keyword in x['Keyword']]
+            filtered = database.entries_with('Keyword', keyword)
             title = keyword.capitalize()
             name = keyword.replace(' ', '-')
             file = '_{}.md'.format(name)
@@ -476,7 +481,7 @@ class EntriesMaintainer:
         # create by platform
         platforms_text = []
         for platform in c.valid_platforms:
-            filtered = [x for x in self.entries if platform in x.get('Platform', [])]
+            filtered = database.entries_with('Platform', platform)
             title = platform
             name = platform.lower()
             file = '_{}.md'.format(name)
@@ -913,6 +918,7 @@ if __name__ == "__main__":
     actions = {
         'Read entries': m.read_entries,
         'Write entries': m.write_entries,
+        'Check fast entry parser': m.check_fast_entry_parser,
         'Check template leftovers': m.check_template_leftovers,
         'Check inconsistencies': m.check_inconsistencies,
         'Check rejected entries': m.clean_rejected,
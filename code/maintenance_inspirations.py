@@ -38,8 +38,10 @@ class InspirationMaintainer:
         if not self.inspirations:
             print('inspirations not yet loaded')
             return
-        osg.write_inspirations(self.inspirations)
-        print('inspirations written')
+        if osg.write_inspirations(self.inspirations):
+            print('inspirations written')
+        else:
+            print('inspirations unchanged')
 
     def check_for_duplicates(self):
         """
@@ -81,12 +83,13 @@ class InspirationMaintainer:
             print('entries not yet loaded')
             return
         # loop over all inspirations
+        database = osg.Database(self.entries, inspirations=self.inspirations)
         for inspiration in self.inspirations.values():
             inspiration_name = inspiration['Name']
             # loop over all entry names stored in that inspiration
             for entry_name in inspiration['Inspired entries']:
                 # get all these entries
-                x = [x for x in self.entries if x['Title'] == entry_name]
+                x = database.entries_with('Title', entry_name)
                 assert len(x) <= 1
                 if not x:
                     print('Entry "{}" listed in inspiration "{}" but this entry does not exist'.format(entry_name, inspiration_name))
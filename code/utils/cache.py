@@ -0,0 +1,99 @@
+"""
+A simple persistent cache on the disk. Only depending on standard Python.
+"""
+
+import os
+import hashlib
+import pickle
+import tempfile
+
+
+def digest(*parts):
+    """
+    Computes a stable digest (SHA-256, hex) of a number of text or binary parts.
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        h.update(part)
+        h.update(b'\0')  # separator, so that ('ab', 'c') and ('a', 'bc') differ
+    return h.hexdigest()
+
+
+class DiskCache:
+    """
+    Stores pickled Python objects in a directory, one file per key. Keys are typically digests of everything the
+    stored value depends on, so a changed input simply leads to a different key (automatic invalidation). Old files
+    are evicted in least recently used order (see trim) when the total size exceeds max_size bytes.
+
+    Writing is atomic, so multiple processes can use the same cache directory at the same time.
+    """
+
+    def __init__(self, path, max_size):
+        self.path = path
+        self.max_size = max_size
+
+    def _file(self, key):
+        return os.path.join(self.path, key + '.pickle')
+
+    def get(self, key, default=None):
+        """
+        Returns the stored value for a key or default if there is none.
+        """
+        file = self._file(key)
+        try:
+            with open(file, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return default
+        except Exception:
+            # corrupted or incompatible, just treat as missing
+            return default
+        # mark as recently used
+        try:
+            os.utime(file)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value):
+        """
+        Stores a value for a key.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        fd, temporary_file = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_file, self._file(key))
+        except BaseException:
+            os.remove(temporary_file)
+            raise
+
+    def trim(self):
+        """
+        Removes the least recently used files until the total size of the cache is below max_size.
+        :return: Number of removed files
+        """
+        if not os.path.isdir(self.path):
+            return 0
+        files = []
+        total_size = 0
+        for entry in os.scandir(self.path):
+            if entry.is_file() and entry.name.endswith('.pickle'):
+                s = entry.stat()
+                files.append((s.st_mtime, s.st_size, entry.path))
+                total_size += s.st_size
+        removed = 0
+        files.sort()  # oldest first
+        for _, size, file in files:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(file)
+            except OSError:
+                continue
+            total_size -= size
+            removed += 1
+        return removed
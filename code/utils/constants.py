@@ -29,6 +29,16 @@ statistics_file = os.path.join(root_path, 'statistics.md')
 screenshots_file = os.path.join(screenshots_path, 'README.md')
 json_db_file = os.path.join(root_path, 'docs', 'data.json')
 
+# persistent caches (can be deleted at any time)
+cache_path = os.path.join(code_path, '.cache')
+parse_cache_path = os.path.join(cache_path, 'parse')
+parse_cache_max_size = 128 * 2**20  # in bytes
+lark_cache_path = os.path.join(cache_path, 'lark')
+website_manifest_file = os.path.join(cache_path, 'website', 'manifest.json')
+website_fragments_path = os.path.join(cache_path, 'website', 'fragments')
+website_fragments_max_size = 128 * 2**20  # in bytes
+website_bytecode_path = os.path.join(cache_path, 'website', 'jinja')
+
 # local config
 local_config_file = os.path.join(root_path, 'local-config.ini')
 
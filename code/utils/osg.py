@@ -4,11 +4,15 @@ Specific functions working on the games.
 
 import re
 import os
+import sys
+import concurrent.futures
+from collections.abc import Mapping, MutableMapping
 from difflib import SequenceMatcher
-from utils import utils, osg_parse, constants as c
+from utils import utils, osg_parse, osg_validation, cache, constants as c
 
 regex_sanitize_name = re.compile(r"[^A-Za-z 0-9-+]+")
 regex_sanitize_name_space_eater = re.compile(r" +")
+regex_web_url = re.compile(r"https?://")
 
 
 def name_similarity(a, b):
@@ -52,50 +56,196 @@ def canonical_name(name):
     return name
 
 
-def read_developers():
+# fields with a closed vocabulary or with names that are referenced elsewhere, their values are interned
+interned_fields = ('Title', 'Name', 'State', 'Platform', 'Keyword', 'Code language', 'Code license', 'Assets license',
+                   'Inspiration', 'Developer', 'Games', 'Inspired entries')
+
+
+def _intern(value):
+    """
+    Interns plain strings (but not values with comments), lists are modified in place.
+    """
+    if type(value) is str:
+        return sys.intern(value)
+    if isinstance(value, list):
+        for index, x in enumerate(value):
+            if type(x) is str:
+                value[index] = sys.intern(x)
+    return value
+
+
+def _slot_names(fields):
+    return tuple(field.lower().replace(' ', '_') for field in fields)
+
+
+class Record(MutableMapping):
+    """
+    A compact record. The known fields are stored in slots, all other fields in an additional dictionary that is only
+    created if needed. Behaves like a dictionary (the known fields come first, in the order of fields), so that it
+    can be used everywhere where dictionaries were used before (maintenance scripts, Jinja templates, ..).
+    """
+    __slots__ = ('_extra',)
+    fields = ()
+    _slots = {}
+
+    def __init__(self, items=()):
+        self._extra = None
+        if isinstance(items, Mapping):
+            items = items.items()
+        for key, value in items:
+            self[key] = value
+
+    def __getitem__(self, key):
+        slot = self._slots.get(key)
+        if slot is not None:
+            try:
+                return getattr(self, slot)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        slot = self._slots.get(key)
+        if key in interned_fields:
+            value = _intern(value)
+        if slot is not None:
+            setattr(self, slot, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        slot = self._slots.get(key)
+        if slot is not None:
+            try:
+                delattr(self, slot)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key):
+        slot = self._slots.get(key)
+        if slot is not None:
+            return hasattr(self, slot)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        for field, slot in self._slots.items():
+            if hasattr(self, slot):
+                yield field
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, dict(self.items()))
+
+
+class Entry(Record):
+    """
+    An entry (a game, framework, library or tool) of the database.
+    """
+    fields = c.valid_fields
+    __slots__ = _slot_names(fields)
+    _slots = dict(zip(fields, __slots__))
+
+
+class Developer(Record):
+    """
+    A developer from the developers file.
+    """
+    fields = c.valid_developer_fields
+    __slots__ = _slot_names(fields)
+    _slots = dict(zip(fields, __slots__))
+
+
+class Inspiration(Record):
+    """
+    An inspiration (original game) from the inspirations file.
+    """
+    fields = c.valid_inspiration_fields
+    __slots__ = _slot_names(fields)
+    _slots = dict(zip(fields, __slots__))
+
+
+def check_listing(items, kind, essential_fields, valid_fields, url_fields):
     """
+    Checks the items of a listing (developers or inspirations) in a single pass: essential fields must exist, all
+    fields must be valid and the url fields must contain web urls. Names should be unique.
+    :param items: List of parsed items (with field 'Name')
+    :param kind: Name of the kind of items (for the error messages)
+    :return: List of duplicate names (in the order of their first repetition)
+    """
+    valid_fields = frozenset(valid_fields)
+    names, duplicate_names = set(), {}
+    for item in items:
+        name = item['Name']
+        if name in names:
+            duplicate_names[name] = None
+        names.add(name)
+        # check that essential fields are existing
+        for field in essential_fields:
+            if field not in item:
+                raise RuntimeError('Essential field "{}" missing in {} {}'.format(field, kind, name))
+        # check that all fields are valid fields
+        for field in item.keys():
+            if field not in valid_fields:
+                raise RuntimeError('Invalid field "{}" in {} {}.'.format(field, kind, name))
+        # url fields
+        for field in url_fields:
+            if field in item and not all(regex_web_url.match(x) for x in item[field]):
+                raise RuntimeError('Invalid URL in field "{}" in {} {}.'.format(field, kind, name))
+    return list(duplicate_names)
 
+
+def read_developers(use_cache=True, compact=True):
+    """
+
+    :param use_cache: If True and developers.md is unchanged, the content is taken from the parse cache.
+    :param compact: If True, developers are stored as Developer records, otherwise as dictionaries.
     :return:
     """
     grammar_file = os.path.join(c.code_path, 'grammar_listing.lark')
-    developers = osg_parse.read_and_parse(c.developer_file, grammar_file, osg_parse.ListingTransformer)
+    parse_cache = get_parse_cache() if use_cache else None
+    developers = osg_parse.read_and_parse(c.developer_file, grammar_file, osg_parse.ListingTransformer, parse_cache)
 
     # now developers is a list of dictionaries for every entry with some properties
 
-    # check for duplicate names entries
-    names = [dev['Name'] for dev in developers]
-    duplicate_names = (name for name in names if names.count(name) > 1)
-    duplicate_names = set(duplicate_names)  # to avoid duplicates in duplicate_names
+    # check for duplicate names and essential, valid fields
+    duplicate_names = check_listing(developers, 'developer', c.essential_developer_fields, c.valid_developer_fields, c.url_developer_fields)
     if duplicate_names:
         print('Warning: duplicate developer names: {}'.format(', '.join(duplicate_names)))
 
-    # check for essential, valid fields
-    for dev in developers:
-        # check that essential fields are existing
-        for field in c.essential_developer_fields:
-            if field not in dev:
-                raise RuntimeError('Essential field "{}" missing in developer {}'.format(field, dev['Name']))
-        # check that all fields are valid fields
-        for field in dev.keys():
-            if field not in c.valid_developer_fields:
-                raise RuntimeError('Invalid field "{}" in developer {}.'.format(field, dev['Name']))
-        # url fields
-        for field in c.url_developer_fields:
-            if field in dev:
-                content = dev[field]
-                if any(not (x.startswith('http://') or x.startswith('https://')) for x in content):
-                    raise RuntimeError('Invalid URL in field "{}" in developer {}.'.format(field, dev['Name']))
-
     # convert to dictionary
+    if compact:
+        developers = [Developer(x) for x in developers]
     developers = {x['Name']: x for x in developers}
 
     return developers
 
 
-def write_developers(developers):
+def write_developers(developers, check=False):
     """
+    Writes the developers file, but only if its content changed.
+    :param developers: Dictionary of developers (by name)
+    :param check: If True, nothing is written, only checked if the file differs from the canonical formatting.
+    :return: True if the developers file is (or would be) changed
+    """
+    content = create_developers_content(developers)
+    return utils.write_text_if_changed(c.developer_file, content, write=not check)
 
-    :return:
+
+def create_developers_content(developers):
+    """
+    Creates the content of the developers file (canonical formatting).
     """
     # convert dictionary to list
     developers = list(developers.values())
@@ -124,69 +274,61 @@ def write_developers(developers):
             value = dev[field]
             # lists get special treatment
             if isinstance(value, list):
-                # remove duplicates
-                value = list(set(value))
-                # sort
-                value.sort(key=str.casefold)
+                # remove duplicates and sort (case sensitive for names only differing in case, to be deterministic)
+                value = sorted(set(value), key=lambda x: (str.casefold(x), x))
                 # surround those with a comma with quotation marks
                 value = [x if not ',' in x else '"{}"'.format(x) for x in value]
                 value = ', '.join(value)
             content += '- {}: {}\n'.format(field, value)
         content += '\n'
 
-    # write
-    utils.write_text(c.developer_file, content)
+    return content
 
 
-def read_inspirations():
+def read_inspirations(use_cache=True, compact=True):
     """
     Reads the info list about the games originals/inspirations from inspirations.md using the Lark parser grammar
     in grammar_listing.lark
+    :param use_cache: If True and inspirations.md is unchanged, the content is taken from the parse cache.
+    :param compact: If True, inspirations are stored as Inspiration records, otherwise as dictionaries.
     :return:
     """
     # read inspirations
 
     # read and parse inspirations
     grammar_file = os.path.join(c.code_path, 'grammar_listing.lark')
-    inspirations = osg_parse.read_and_parse(c.inspirations_file, grammar_file, osg_parse.ListingTransformer)
+    parse_cache = get_parse_cache() if use_cache else None
+    inspirations = osg_parse.read_and_parse(c.inspirations_file, grammar_file, osg_parse.ListingTransformer, parse_cache)
 
     # now inspirations is a list of dictionaries for every entry with some properties
 
-    # check for duplicate names entries
-    names = [inspiration['Name'] for inspiration in inspirations]
-    duplicate_names = (name for name in names if names.count(name) > 1)
-    duplicate_names = set(duplicate_names)  # to avoid duplicates in duplicate_names
+    # check for duplicate names and essential, valid fields
+    duplicate_names = check_listing(inspirations, 'inspiration', c.essential_inspiration_fields, c.valid_inspiration_fields, c.url_inspiration_fields)
     if duplicate_names:
         raise RuntimeError('Duplicate inspiration names: {}'.format(', '.join(duplicate_names)))
 
-    # check for essential, valid fields
-    for inspiration in inspirations:
-        # check that essential fields are existing
-        for field in c.essential_inspiration_fields:
-            if field not in inspiration:
-                raise RuntimeError('Essential field "{}" missing in inspiration {}'.format(field, inspiration['Name']))
-        # check that all fields are valid fields
-        for field in inspiration.keys():
-            if field not in c.valid_inspiration_fields:
-                raise RuntimeError('Invalid field "{}" in inspiration {}.'.format(field, inspiration['Name']))
-        # url fields
-        for field in c.url_inspiration_fields:
-            if field in inspiration:
-                content = inspiration[field]
-                if any(not (x.startswith('http://') or x.startswith('https://')) for x in content):
-                    raise RuntimeError('Invalid URL in field "{}" in inspiration {}.'.format(field, inspiration['Name']))
-
     # convert to dictionary
+    if compact:
+        inspirations = [Inspiration(x) for x in inspirations]
     inspirations = {x['Name']: x for x in inspirations}
 
     return inspirations
 
 
-def write_inspirations(inspirations):
+def write_inspirations(inspirations, check=False):
     """
-    Given an internal dictionary of inspirations, write it into the inspirations file
-    :param inspirations:
-    :return:
+    Given an internal dictionary of inspirations, write it into the inspirations file, but only if its content changed.
+    :param inspirations: Dictionary of inspirations (by name)
+    :param check: If True, nothing is written, only checked if the file differs from the canonical formatting.
+    :return: True if the inspirations file is (or would be) changed
+    """
+    content = create_inspirations_content(inspirations)
+    return utils.write_text_if_changed(c.inspirations_file, content, write=not check)
+
+
+def create_inspirations_content(inspirations):
+    """
+    Creates the content of the inspirations file (canonical formatting).
     """
     # convert dictionary to list
     inspirations = list(inspirations.values())
@@ -215,66 +357,137 @@ def write_inspirations(inspirations):
             value = inspiration[field]
             # lists get special treatment
             if isinstance(value, list):
-                value.sort(key=str.casefold)  # sorted alphabetically
+                # sorted alphabetically (case sensitive for names only differing in case, to be deterministic)
+                value = sorted(value, key=lambda x: (str.casefold(x), x))
                 value = [x if not ',' in x else '"{}"'.format(x) for x in value]  # surround those with a comma with quotation marks
                 value = ', '.join(value)
             content += '- {}: {}\n'.format(field, value)
         content += '\n'
 
-    # write
-    utils.write_text(c.inspirations_file, content)
+    return content
 
 
-def read_entries():
-    """
-    Parses all entries and assembles interesting infos about them.
+def read_entries(parallel=False, max_workers=None, use_cache=True, compact=True):
     """
+    Parses all entries and assembles interesting infos about them. Entries from the parse cache are validated in this
+    process (sending them to worker processes would take longer than the checks).
 
-    # setup parser and transformer
+    :param parallel: If True, the entries are parsed and validated in a pool of worker processes (each with its own parser).
+    :param max_workers: Number of worker processes (default: number of processors), only used if parallel is True.
+    :param use_cache: If True, unchanged entries are taken from the parse cache instead of being parsed again.
+    :param compact: If True, entries are stored as Entry records, otherwise as dictionaries.
+    """
     grammar_file = os.path.join(c.code_path, 'grammar_entries.lark')
     grammar = utils.read_text(grammar_file)
-    parse = osg_parse.create(grammar, osg_parse.EntryTransformer)
-
-    # a database of all important infos about the entries
-    entries = []
+    parse_cache = get_parse_cache() if use_cache else None
 
-    # iterate over all entries
-    exception_happened = None
+    # get all entry files and their content (always in the same order) and look them up in the cache
+    files, contents, keys, parsed = [], [], [], []
     for file, _, content in entry_iterator():
-
         if not content.endswith('\n'):
             content += '\n'
+        files.append(file)
+        contents.append(content)
+        if parse_cache is not None:
+            key = osg_parse.cache_key(grammar, content, osg_parse.EntryTransformer)
+            keys.append(key)
+            parsed.append(parse_cache.get(key))
+        else:
+            parsed.append(None)
+
+    # parse, transform and validate the remaining entry contents, either here or in a pool of worker processes
+    missing = [index for index, x in enumerate(parsed) if x is None]
+    missing_files = [files[index] for index in missing]
+    missing_contents = [contents[index] for index in missing]
+    if parallel and len(missing) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=_init_entry_parser) as executor:
+            results = list(executor.map(_parse_entry_worker, missing_files, missing_contents, chunksize=32))
+    else:
+        _init_entry_parser()
+        results = [_parse_entry_worker(file, content) for file, content in zip(missing_files, missing_contents)]
+    processed = {}
+    for index, (result, outcome) in zip(missing, results):
+        processed[index] = outcome
+        if result is None:
+            continue
+        parsed[index] = result
+        if parse_cache is not None:
+            parse_cache.put(keys[index], result)
+    if parse_cache is not None and missing:
+        parse_cache.trim()
 
-        # parse and transform entry content
-        try:
-            entry = parse(content)
-            entry = [('File', file),] + entry # add file information to the beginning
-            entry = check_and_process_entry(entry)
-        except Exception as e:
-            print('{} - {}'.format(file, e))
-            exception_happened = e # just store last one
+    # a database of all important infos about the entries
+    entries = []
+
+    # check all entries and collect all errors (the entries from the parse cache are validated here)
+    validation_errors = []
+    for index, file in enumerate(files):
+        if index in processed:
+            entry, entry_errors = processed[index]
+        else:
+            entry, entry_errors = osg_validation.process_entry([('File', file),] + parsed[index])
+        if entry_errors:
+            validation_errors.extend(entry_errors)
             continue
+        if compact:
+            entry = Entry(entry)
 
         # add to list
         entries.append(entry)
-    if exception_happened:
-        print('error(s) while reading entries')
-        raise exception_happened
+    if validation_errors:
+        for error in validation_errors:
+            print(error)
+        print('{} error(s) in {} entries while reading entries'.format(len(validation_errors), len(set(error.file for error in validation_errors))))
+        raise osg_validation.EntryValidationError(validation_errors)
 
     return entries
 
 
-def read_entry(file):
+def get_parse_cache():
+    """
+    The persistent cache of parsed and transformed entries, developers and inspirations.
+    """
+    return cache.DiskCache(c.parse_cache_path, c.parse_cache_max_size)
+
+
+def _init_entry_parser():
+    """
+    Sets up the entry parser and transformer for this process. Also used as initializer of the worker processes in
+    read_entries.
+    """
+    grammar_file = os.path.join(c.code_path, 'grammar_entries.lark')
+    osg_parse.get_parser(grammar_file, osg_parse.EntryTransformer)
+
+
+def _parse_entry_worker(file, content):
+    """
+    Parses, transforms and validates a single entry content. Errors are returned instead of raised, so that all
+    entries can be processed and the errors can be collected afterwards.
+    :param file: the entry file (without path)
+    :param content: the entry content
+    :return: tuple (transformed content or None if it cannot be parsed, tuple (entry, list of ValidationError))
+    """
+    grammar_file = os.path.join(c.code_path, 'grammar_entries.lark')
+    try:
+        result = osg_parse.parse_entry(content, grammar_file)
+    except Exception as e:
+        return None, (None, [osg_validation.ValidationError(file, 'parse', str(e))])
+    entry = [('File', file),] + result # add file information to the beginning
+    return result, osg_validation.process_entry(entry)
+
+
+def read_entry(file, use_cache=True, compact=True):
     """
     Reads a single entry
     :param file: the entry file (without path)
+    :param use_cache: If True and the entry is unchanged, the content is taken from the parse cache.
+    :param compact: If True, the entry is stored as Entry record, otherwise as dictionary.
     :return: the entry
     """
 
     # setup parser and transformer
     grammar_file = os.path.join(c.code_path, 'grammar_entries.lark')
-    grammar = utils.read_text(grammar_file)
-    parse = osg_parse.create(grammar, osg_parse.EntryTransformer)
+    parse_cache = get_parse_cache() if use_cache else None
 
     # read entry file
     content = utils.read_text(os.path.join(c.entries_path, file))
@@ -283,136 +496,278 @@ def read_entry(file):
 
     # parse and transform entry content
     try:
-        entry = parse(content)
-        entry = [('File', file),] + entry # add file information to the beginning
-        entry = check_and_process_entry(entry)
+        entry = None
+        if parse_cache is not None:
+            key = osg_parse.cache_key(utils.read_text(grammar_file), content, osg_parse.EntryTransformer)
+            entry = parse_cache.get(key)
+        if entry is None:
+            entry = osg_parse.parse_entry(content, grammar_file)
+            if parse_cache is not None:
+                parse_cache.put(key, entry)
     except Exception as e:
-        print('{} - {}'.format(file, e))
-        raise RuntimeError(e)
-
+        errors = [osg_validation.ValidationError(file, 'parse', str(e))]
+    else:
+        entry = [('File', file),] + entry # add file information to the beginning
+        entry, errors = osg_validation.process_entry(entry)
+    if errors:
+        for error in errors:
+            print(error)
+        raise osg_validation.EntryValidationError(errors)
+
+    if compact:
+        entry = Entry(entry)
     return entry
 
 
-def check_and_process_entry(entry):
+class Database:
     """
+    Entries, developers and inspirations together with hash indexes on the entries, so that lookups do not need to
+    scan all entries.
 
-    :param entry:
-    :return:
+    by_file maps entry files to entries. index maps each of the indexed_fields to an inverted index (value -> list of
+    entries having that value, in the order of the entries). Titles are not unique, so they are in the inverted index
+    too. The lists are shared, do not modify them. After changing the entries, call reindex.
     """
-    message = ''
-
-    # check that all fields are valid fields and are existing in that order
-    index = 0
-    for e in entry:
-        field = e[0]
-        while index < len(c.valid_fields) and field != c.valid_fields[index]:
-            index += 1
-        if index == len(c.valid_fields):  # must be valid fields and must be in the right order
-            message += 'Field "{}" either misspelled or in wrong order\n'.format(field)
-
-    # order is fine we can convert now to dictionary
-    d = {}
-    for field, value in entry:
-        if field in d:
-            message += 'Field "{}" appears twice\n'.format(field)
-        d[field] = value
-    entry = d
-
-    # check for essential fields
-    for field in c.essential_fields:
-        if field not in entry:
-            message += 'Essential property "{}" missing\n'.format(field)
-
-    # now the same treatment for building
-    building = entry['Building']
-    d = {}
-    for field, value in building:
-        if field in d:
-            message += 'Field "{}" appears twice\n'.format(field)
-        d[field] = value
-    building = d
-
-    # check valid fields in building TODO should also check order
-    for field in building.keys():
-        if field not in c.valid_building_fields:
-            message += 'Building field "{}" invalid\n'.format(field)
-    entry['Building'] = building
-
-    # check canonical file name
-    file = entry['File']
-    canonical_file_name = canonical_name(entry['Title']) + '.md'
-    # we also allow -X with X =2..9 as possible extension (because of duplicate canonical file names)
-    if canonical_file_name != file and canonical_file_name != file[:-5] + '.md':
-        message += 'File name should be {}\n'.format(canonical_file_name)
-
-    # check that fields without comments have no comments (i.e. are no Values)
-    for field in c.fields_without_comments:
-        if field in entry:
-            content = entry[field]
-            if any(isinstance(item, osg_parse.Value) for item in content):
-                message += 'field without comments {} has comment\n'.format(field)
 
-    # state must contain either beta or mature but not both
-    state = entry['State']
-    for t in state:
-        if t != 'beta' and t != 'mature' and not t.startswith('inactive since '):
-            message += 'Unknown state "{}"'.format(t)
-    if 'beta' in state == 'mature' in state:
-        message += 'State must be one of <"beta", "mature">'
-
-    # check urls
-    for field in c.url_fields:
-        values = entry.get(field, [])
-        for value in values:
-            if value.startswith('<') and value.endswith('>'):
-                value = value[1:-1]
-            if not any(value.startswith(x) for x in c.valid_url_prefixes):
-                message += 'URL "{}" in field "{}" does not start with a valid prefix'.format(value, field)
-
-    # github/gitlab repositories should end on .git and should start with https
-    for repo in entry.get('Code repository', []):
-        if any(repo.startswith(x) for x in ('@', '?')):
-            continue
-        repo = repo.split(' ')[0].strip()
-        if any((x in repo for x in ('github', 'gitlab', 'git.tuxfamily', 'git.savannah'))):
-                if not repo.startswith('https://'):
-                    message += 'Repo "{}" should start with https://'.format(repo)
-                if not repo.endswith('.git'):
-                    message += 'Repo "{}" should end on .git.'.format(repo)
-
-    # check that all platform tags are valid tags and are existing in that order
-    if 'Platform' in entry:
-        index = 0
-        for platform in entry['Platform']:
-            while index < len(c.valid_platforms) and platform != c.valid_platforms[index]:
-                index += 1
-            if index == len(c.valid_platforms):  # must be valid platforms and must be in that order
-                message += 'Platform tag "{}" either misspelled or in wrong order'.format(platform)
-
-    # there must be at least one keyword
-    if not entry['Keyword']:
-        message += 'Need at least one keyword'
-
-    # check for existence of at least one recommended keywords
-    keywords = entry['Keyword']
-    if not any(keyword in keywords for keyword in c.recommended_keywords):
-        message += 'Entry contains no recommended keywords'
+    # entry fields with an inverted index
+    indexed_fields = ('Title', 'Keyword', 'Platform', 'Code language', 'Code license', 'Developer', 'Inspiration')
+
+    def __init__(self, entries, developers=None, inspirations=None):
+        """
+        :param entries: List of entries
+        :param developers: Dictionary of developers (by name), optional
+        :param inspirations: Dictionary of inspirations (by name), optional
+        """
+        self.entries = entries
+        self.developers = developers if developers is not None else {}
+        self.inspirations = inspirations if inspirations is not None else {}
+        self.by_file = {}
+        self.index = {}
+        self.reindex()
+
+    @classmethod
+    def read(cls, parallel=False):
+        """
+        Reads entries, developers and inspirations.
+        :param parallel: If True, the entries are parsed in a pool of worker processes.
+        """
+        return cls(read_entries(parallel=parallel), read_developers(), read_inspirations())
+
+    def reindex(self):
+        """
+        (Re-)builds the indexes in a single pass over the entries.
+        """
+        self.by_file = {}
+        self.index = {field: {} for field in self.indexed_fields}
+        for entry in self.entries:
+            self.by_file[entry['File']] = entry
+            for field, index in self.index.items():
+                values = entry.get(field, ())
+                if isinstance(values, str):
+                    values = (values,)
+                for value in dict.fromkeys(values):  # an entry only once, even if a value appears twice
+                    index.setdefault(value, []).append(entry)
+
+    def entries_with(self, field, value):
+        """
+        All entries having a value in an indexed field (in the order of the entries).
+        :param field: One of the indexed_fields
+        :param value: The value
+        :return: List of entries (empty if there are none)
+        """
+        return self.index[field].get(value, [])
+
+    def entry_by_file(self, file):
+        """
+        The entry stored in a file (without path) or None.
+        """
+        return self.by_file.get(file)
+
+    def developer_entries(self, name):
+        """
+        The entries listing a developer.
+        """
+        return self.entries_with('Developer', name)
+
+    def inspiration_entries(self, name):
+        """
+        The entries listing an inspiration.
+        """
+        return self.entries_with('Inspiration', name)
+
+
+def git_output(args, revision):
+    """
+    Runs git in the root directory and returns its output.
+    :param args: The arguments of git
+    :param revision: The git revision used in args (only for the error message)
+    :return: The std output of git
+    """
+    try:
+        return utils.subprocess_run(['git', '-C', c.root_path] + args, display=False)
+    except RuntimeError as e:
+        raise RuntimeError('git failed for revision "{}": {}'.format(revision, e)) from e
 
-    # languages should be known
-    languages = entry['Code language']
-    for language in languages:
-        if language not in c.known_languages:
-            message += 'Language "{}" is not a known code language. Misspelled or new?'.format(language)
 
-    # licenses should be known
-    licenses = entry['Code license']
-    for license in licenses:
-        if license not in c.known_licenses:
-            message += 'License "{}" is not a known license. Misspelled or new?'.format(license)
+def changed_entry_files(revision='HEAD'):
+    """
+    Asks git for the entry files that were changed (or added) since a revision, including changes in the working tree
+    and untracked entry files. Deleted entries are not included (see removed_entry_titles), renamed entries are
+    included under their new name.
+    :param revision: Any git revision, for example 'HEAD' (only changes in the working tree) or 'origin/master'
+    :return: List of entry files (without path)
+    """
+    changed = git_output(['diff', '--name-only', '--no-renames', '--diff-filter=d', revision, '--', 'entries'], revision)
+    untracked = git_output(['ls-files', '--others', '--exclude-standard', '--', 'entries'], revision)
+    files = set()
+    for path in (changed + untracked).splitlines():
+        path = path.strip()
+        # only the entries themselves, not the tocs or screenshots
+        if os.path.dirname(path) == 'entries' and path.endswith('.md'):
+            files.add(os.path.basename(path))
+    return sorted(files)
+
+
+def removed_entry_titles(revision='HEAD'):
+    """
+    Asks git for the entry files that were deleted (or renamed) since a revision and reads their titles in that
+    revision.
+    :param revision: Any git revision
+    :return: Dictionary title -> entry file (without path)
+    """
+    removed = git_output(['diff', '--name-only', '--no-renames', '--diff-filter=D', revision, '--', 'entries'], revision)
+    titles = {}
+    for path in removed.splitlines():
+        path = path.strip()
+        if os.path.dirname(path) == 'entries' and path.endswith('.md'):
+            content = git_output(['show', '{}:{}'.format(revision, path)], revision)
+            match = re.match(r'# (.+)', content)
+            if match:
+                titles[match.group(1).strip()] = os.path.basename(path)
+    return titles
+
+
+def validate_changed_entries(revision='HEAD'):
+    """
+    Validates only the entries changed since a revision (see changed_entry_files) and the cross-references between
+    them and the developers and inspirations whose names appear in them. Developers and inspirations must not list
+    entries removed since the revision (see removed_entry_titles). The effort only depends on the number of changed
+    entries (and the size of the developers and inspirations files), not on the number of entries.
+    :param revision: Any git revision
+    :return: List of osg_validation.ValidationError (empty if everything is fine)
+    """
+    files = changed_entry_files(revision)
+    removed = removed_entry_titles(revision)
+    print('{} changed and {} removed entries since {}'.format(len(files), len(removed), revision))
+    errors = []
 
-    if message:
-        raise RuntimeError(message)
+    # parse and check the changed entries
+    entries = []
+    for file in files:
+        try:
+            entries.append(read_entry(file))
+        except osg_validation.EntryValidationError as e:
+            errors.extend(e.errors)
+    if not entries and not removed:
+        return errors
+
+    # cross-references with the developers and inspirations
+    titles = {entry['Title']: entry for entry in entries}
+    # a renamed entry file keeps its title
+    removed = {title: file for title, file in removed.items() if title not in titles}
+    for reader, field, listing_field, name in ((read_developers, 'Developer', 'Games', 'developer'),
+                                               (read_inspirations, 'Inspiration', 'Inspired entries', 'inspiration')):
+        listing = reader()
+        # names in the changed entries must exist and list the entry
+        for entry in entries:
+            for x in entry.get(field, []):
+                if x not in listing:
+                    errors.append(osg_validation.ValidationError(entry['File'], name + '-exists', '{} "{}" does not exist'.format(name, x)))
+                elif entry['Title'] not in listing[x][listing_field]:
+                    errors.append(osg_validation.ValidationError(entry['File'], name + '-lists-entry', '{} "{}" does not list entry "{}"'.format(name, x, entry['Title'])))
+        # the other direction, listings referencing one of the changed entries must be listed in that entry
+        # and listings must not reference removed entries
+        for x in listing.values():
+            for title in x[listing_field]:
+                if title in titles and x['Name'] not in titles[title].get(field, []):
+                    errors.append(osg_validation.ValidationError(titles[title]['File'], name + '-listed-in-entry', '{} "{}" lists entry "{}" but not the other way round'.format(name, x['Name'], title)))
+                elif title in removed:
+                    errors.append(osg_validation.ValidationError(removed[title], name + '-lists-removed-entry', '{} "{}" lists removed entry "{}"'.format(name, x['Name'], title)))
+
+    for error in errors:
+        print(error)
+    print('{} error(s) in {} changed and {} removed entries'.format(len(errors), len(files), len(removed)))
+    return errors
+
+
+def validate_entries(parallel=True):
+    """
+    Validates all entries (in parallel if wanted), collecting all problems. Entries from the parse cache are validated
+    in this process (about 0.1 s for all entries), see read_entries.
+    :param parallel: If True, the entries are parsed and validated in a pool of worker processes.
+    :return: List of osg_validation.ValidationError (empty if everything is fine)
+    """
+    try:
+        read_entries(parallel=parallel)
+    except osg_validation.EntryValidationError as e:
+        return e.errors
+    print('all entries are valid')
+    return []
 
+
+def check_fast_entry_parser():
+    """
+    Differential test of the fast entry parser. Parses all entries with the fast parser and with the Lark parser and
+    reports any difference (including the comments and the types of the values).
+    :return: List of entry files where both parsers differ
+    """
+    grammar_file = os.path.join(c.code_path, 'grammar_entries.lark')
+    parse = osg_parse.get_parser(grammar_file, osg_parse.EntryTransformer)
+
+    def structure(x):
+        # a comparable representation, that distinguishes values with comments from plain strings
+        if isinstance(x, (list, tuple)):
+            return type(x).__name__, [structure(y) for y in x]
+        if isinstance(x, osg_parse.Value):
+            return 'Value', str(x), x.comment
+        return type(x).__name__, x
+
+    def result(fun, content):
+        try:
+            return structure(fun(content))
+        except osg_parse.FastPathUnsupported:
+            raise
+        except Exception as e:
+            return 'error', type(e).__name__
+
+    divergent = []
+    number_entries, number_fast = 0, 0
+    for file, _, content in entry_iterator():
+        if not content.endswith('\n'):
+            content += '\n'
+        number_entries += 1
+        try:
+            fast = result(osg_parse.fast_parse_entry, content)
+        except osg_parse.FastPathUnsupported:
+            continue  # would use the Lark parser anyway
+        number_fast += 1
+        if fast != result(parse, content):
+            print('{} - fast entry parser gives a different result'.format(file))
+            divergent.append(file)
+    print('fast entry parser used for {} of {} entries, {} differences'.format(number_fast, number_entries, len(divergent)))
+    return divergent
+
+
+def check_and_process_entry(entry):
+    """
+    Converts a parsed entry into a dictionary and validates it (see osg_validation.entry_rules).
+    :param entry: The parsed entry (list of (field, value) tuples, starting with the file)
+    :return: The entry as dictionary
+    :raises osg_validation.EntryValidationError: with all problems of the entry
+    """
+    entry, errors = osg_validation.process_entry(entry)
+    if errors:
+        raise osg_validation.EntryValidationError(errors)
     return entry
 
 
@@ -433,22 +788,30 @@ def extract_inactive_year(entry):
         return None
 
 
-def write_entries(entries):
+def write_entries(entries, check=False, max_workers=None):
     """
-
-    :return:
+    Writes all entries, but only those whose content changed (unchanged entry files are not touched). The contents
+    are rendered and compared in a pool of threads.
+    :param entries: List of entries
+    :param check: If True, nothing is written, only the entries whose files differ from the canonical formatting are
+    reported.
+    :param max_workers: Number of threads (default: depending on the number of processors)
+    :return: List of changed entry files (or of entry files that would be changed in check mode)
     """
-
-    # iterate over all entries
-    for entry in entries:
-        write_entry(entry)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        changed = list(executor.map(lambda entry: write_entry(entry, check=check), entries))
+    files = [entry['File'] for entry, x in zip(entries, changed) if x]
+    print('{} of {} entries {}'.format(len(files), len(entries), 'differ from the canonical formatting' if check else 'changed'))
+    return files
 
 
-def write_entry(entry, overwrite=True):
+def write_entry(entry, overwrite=True, check=False):
     """
-
-    :param entry:
-    :return:
+    Writes an entry, but only if the content of the entry file changed.
+    :param entry: The entry
+    :param overwrite: If False, an existing entry file is an error.
+    :param check: If True, nothing is written, only checked if the entry file differs from the canonical formatting.
+    :return: True if the entry file is (or would be) changed
     """
     # TODO check entry
 
@@ -461,7 +824,7 @@ def write_entry(entry, overwrite=True):
     content = create_entry_content(entry)
 
     # write entry
-    utils.write_text(entry_path, content)
+    return utils.write_text_if_changed(entry_path, content, write=not check)
 
 
 def render_value(value):
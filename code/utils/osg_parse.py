@@ -2,9 +2,10 @@
 
 """
 
+import os
 from functools import partial
 import lark
-from utils import utils, constants as c
+from utils import utils, cache, constants as c
 
 
 class ListingTransformer(lark.Transformer):
@@ -157,6 +158,9 @@ class EntryTransformer(lark.Transformer):
 class Value(str):
     """
     A value is a string with an additional meta-object (a comment) but mostly behaves as a string.
+
+    Subclasses of str cannot have non-empty slots, therefore the comment lives in the instance dictionary. Only
+    values that have a comment are created as Value, all others stay plain (and possibly interned) strings.
     """
 
     def __new__(cls, value, comment=None):
@@ -164,29 +168,244 @@ class Value(str):
         obj.comment = comment
         return obj
 
+
+class FastPathUnsupported(Exception):
+    """
+    Raised by the fast entry parser if it does not recognize the content (the Lark parser should be used instead).
+    """
+    pass
+
+
+def _fast_parse_values(text):
+    """
+    Parses the values part of a property line (everything after the ":") like the entries grammar and the
+    EntryTransformer would do.
+    """
+    values = []
+    n = len(text)
+    p = 0
+    while True:
+        # skip white space, then a value must follow
+        while p < n and text[p] == ' ':
+            p += 1
+        if p == n or text[p] == ',':
+            raise FastPathUnsupported()
+
+        # quoted or unquoted value
+        if text[p] == '"':
+            end = text.find('"', p + 1)
+            if end == -1:
+                raise FastPathUnsupported()
+            value = text[p + 1:end].strip()
+            p = end + 1
+        else:
+            # unquoted values end before the next ",", " (" or the end of the line
+            end = n
+            for x in (',', ' ('):
+                i = text.find(x, p + 1)
+                if i != -1 and i < end:
+                    end = i
+            value = text[p:end].strip()
+            p = end
+
+        # optional comment (must be preceded by a space)
+        while p < n and text[p] == ' ':
+            p += 1
+        if p < n and text[p] == '(':
+            if text[p - 1] != ' ':
+                raise FastPathUnsupported()
+            end = text.find(')', p + 2)
+            if end == -1:
+                raise FastPathUnsupported()
+            value = Value(value, text[p + 1:end].strip())
+            p = end + 1
+            while p < n and text[p] == ' ':
+                p += 1
+        values.append(value)
+
+        # either end of line or a comma and the next value
+        if p == n:
+            return values
+        if text[p] != ',':
+            raise FastPathUnsupported()
+        p += 1
+
+
+def _fast_parse_property(line):
+    """
+    Parses a "- Key: values" line.
+    """
+    line = line[1:].lstrip(' ')
+    index = line.find(':')
+    if index <= 0 or line[index - 1] == ' ':
+        raise FastPathUnsupported()
+    return line[:index], _fast_parse_values(line[index + 1:])
+
+
+def _fast_parse_note(lines):
+    """
+    Free text lines, returns None if there is no note.
+    """
+    for line in lines:
+        if line.startswith('-') or line.startswith('#'):
+            raise FastPathUnsupported()
+    note = ''.join(line + '\n' for line in lines).strip()
+    return ('Note', note) if note else None
+
+
+def fast_parse_entry(content):
+    """
+    Specialized single-pass parser for the line oriented entry format. Gives exactly the same result as parsing with
+    grammar_entries.lark and transforming with the EntryTransformer, but only for the canonical form of entries
+    (as written by osg.create_entry_content). For everything else, FastPathUnsupported is raised.
+
+    :param content: Content of an entry file (ending on a new line)
+    :return: The transformed entry
+    """
+    # anything with tabs, carriage returns or indented lines goes to the general parser
+    if not content.endswith('\n') or '\t' in content or '\r' in content or '\n ' in content or content.startswith(' '):
+        raise FastPathUnsupported()
+    lines = content[:-1].split('\n')
+    n = len(lines)
+
+    # title and an empty line
+    if n < 3 or not lines[0].startswith('#') or lines[1]:
+        raise FastPathUnsupported()
+    title = lines[0][1:].strip(' ')
+    if not title or title.startswith('#'):
+        raise FastPathUnsupported()
+    entry = [('Title', title)]
+
+    # properties (at least one) and an empty line
+    i = 2
+    while i < n and lines[i].startswith('-'):
+        entry.append(_fast_parse_property(lines[i]))
+        i += 1
+    if i == 2 or i == n or lines[i]:
+        raise FastPathUnsupported()
+    i += 1
+
+    # note until the building section
+    try:
+        j = lines.index('## Building', i)
+    except ValueError:
+        raise FastPathUnsupported()
+    note = _fast_parse_note(lines[i:j])
+    if note:
+        entry.append(note)
+
+    # building section: an empty line, optional properties, an empty line and an optional note
+    building = []
+    i = j + 1
+    if i < n:
+        if lines[i]:
+            raise FastPathUnsupported()
+        i += 1
+        while i < n and lines[i].startswith('-'):
+            building.append(_fast_parse_property(lines[i]))
+            i += 1
+        if building and i < n:
+            if lines[i]:
+                raise FastPathUnsupported()
+            i += 1
+        note = _fast_parse_note(lines[i:])
+        if note:
+            building.append(note)
+    entry.append(('Building', building))
+
+    return entry
+
+
+def parse_entry(content, grammar_file):
+    """
+    Parses and transforms an entry content. Uses the fast parser if possible and the Lark parser otherwise.
+    """
+    try:
+        return fast_parse_entry(content)
+    except FastPathUnsupported:
+        parse = get_parser(grammar_file, EntryTransformer)
+        return parse(content)
+
+
 def parse(parser, transformer, content):
     tree = parser.parse(content)
     value = transformer.transform(tree)
     return value
 
 
-def create(grammar, Transformer):
-    parser = lark.Lark(grammar, debug=False, parser='lalr')
+def create(grammar, Transformer, cache_file=None):
+    """
+    Creates a parse function from a grammar and a transformer.
+    :param cache_file: Optional file for storing the compiled parser (Lark checks that it belongs to the grammar)
+    """
+    parser = lark.Lark(grammar, debug=False, parser='lalr', cache=cache_file if cache_file else False)
     transformer = Transformer()
     return partial(parse, parser, transformer)
 
 
-def read_and_parse(content_file: str, grammar_file: str, Transformer: lark.Transformer):
+# the parse functions of this process by grammar file and transformer (see get_parser)
+_parsers = {}
+
+
+def get_parser(grammar_file: str, Transformer: lark.Transformer):
+    """
+    Returns the parse function for a grammar file and a transformer. It is created at most once per process. The
+    compiled parser is additionally stored in the cache directory (keyed by a hash of the grammar), so that also
+    later runs do not need to build the parser tables again.
+    """
+    key = (grammar_file, Transformer)
+    if key not in _parsers:
+        grammar = utils.read_text(grammar_file)
+        os.makedirs(c.lark_cache_path, exist_ok=True)
+        cache_file = os.path.join(c.lark_cache_path, cache.digest(lark.__version__, grammar) + '.lark')
+        _parsers[key] = create(grammar, Transformer, cache_file)
+    return _parsers[key]
+
+
+def cache_key(grammar: str, content: str, Transformer: lark.Transformer):
+    """
+    Key for storing the transformed parse result of a content in a parse cache. Depends on the grammar, the content,
+    the transformer and the source of this module (so that changes to the transformers invalidate the cache as well).
+    """
+    return cache.digest(_source_digest(), Transformer.__name__, grammar, content)
+
+
+_source_digest_value = None
+
+
+def _source_digest():
+    global _source_digest_value
+    if _source_digest_value is None:
+        _source_digest_value = cache.digest(utils.read_text(__file__))
+    return _source_digest_value
+
+
+def read_and_parse(content_file: str, grammar_file: str, Transformer: lark.Transformer, parse_cache: cache.DiskCache = None):
     """
     Reads a content file and a grammar file and parses the content with the grammar following by
     transforming the parsed output and returning the transformed result.
     :param content_file:
     :param grammar_file:
     :param transformer:
+    :param parse_cache: Optional cache of transformed results, the parser is only used if not stored there already
     :return:
     """
     grammar = utils.read_text(grammar_file)
-    parse = create(grammar, Transformer)
-
     content = utils.read_text(content_file)
-    return parse(content)
\ No newline at end of file
+
+    # look up in the cache
+    if parse_cache is not None:
+        key = cache_key(grammar, content, Transformer)
+        value = parse_cache.get(key)
+        if value is not None:
+            return value
+
+    parse = get_parser(grammar_file, Transformer)
+    value = parse(content)
+
+    # store in the cache
+    if parse_cache is not None:
+        parse_cache.put(key, value)
+        parse_cache.trim()
+
+    return value
@@ -1,14 +1,21 @@
 """
 Central place to calculate statistics about the entries. Used for updating the statistics.md file and the statistics page
 of the website.
+
+Charts are written as SVG directly (see svg_charts), matplotlib is optional and only used (and imported) if chosen
+as backend.
 """
 
 import os
-import numpy as np
-import matplotlib.pyplot as plt
+from utils import utils, svg_charts
 
 BASE_FIGURE_SIZE = 4
 
+# size of the charts is in inches (like in matplotlib), in pt for svg
+POINTS_PER_INCH = 72
+
+chart_backends = ('svg', 'matplotlib')
+
 
 def get_field_statistics(entries, field, sub_field=None, include_NA=True):
     """
@@ -59,34 +66,56 @@ def truncate_stats(stat, threshold, name='Other'):
     return a
 
 
-def export_pie_chart(stat, file):
+def prepare_chart_file(file, backend):
+    """
+    Creates the output directory if necessary and checks the backend.
+    """
+    if backend not in chart_backends:
+        raise RuntimeError('Unknown chart backend "{}"'.format(backend))
+    containing_dir = os.path.dirname(file)
+    if not os.path.isdir(containing_dir):
+        os.mkdir(containing_dir)
+
+
+def export_pie_chart(stat, file, backend='svg'):
     """
-    Given a statistics, creates a pie chart using matplotlib and exports it into a file as SVG.
+    Given a statistics, creates a pie chart and exports it into a file as SVG.
+    :param backend: One of chart_backends
     """
     labels = [x[0] for x in stat]
     sizes = [x[1] for x in stat]
+    prepare_chart_file(file, backend)
+
+    if backend == 'svg':
+        utils.write_text(file, svg_charts.pie_chart(labels, sizes, BASE_FIGURE_SIZE * POINTS_PER_INCH))
+        return
 
     # create pie chart
+    import matplotlib.pyplot as plt
     fig, ax = plt.subplots(figsize=[BASE_FIGURE_SIZE,BASE_FIGURE_SIZE], tight_layout=True)
     ax.pie(sizes, labels=labels, autopct='%1.1f%%', pctdistance=0.8, shadow=True, labeldistance=1.2, normalize=True)
 
-    # create output directory if necessary
-    containing_dir = os.path.dirname(file)
-    if not os.path.isdir(containing_dir):
-        os.mkdir(containing_dir)
-
     # save figure
-    plt.savefig(file, transparent=True)  # TODO can we also just generate svg in text form and save later?
+    plt.savefig(file, transparent=True)
+    plt.close(fig)
 
 
-def export_bar_chart(stat, file, aspect_ratio = 1, tick_label_rotation=0):
+def export_bar_chart(stat, file, aspect_ratio = 1, tick_label_rotation=0, backend='svg'):
     """
-    Given a statistics, creates a bar chart using matplotlib and exports it into a file as SVG.
+    Given a statistics, creates a bar chart and exports it into a file as SVG.
+    :param backend: One of chart_backends
     """
-    x = np.arange(len(stat))
     tick_label, height = [[x[i] for x in stat] for i in (0, 1)]
+    prepare_chart_file(file, backend)
 
-    # create pie chart
+    if backend == 'svg':
+        utils.write_text(file, svg_charts.bar_chart(tick_label, height, aspect_ratio * BASE_FIGURE_SIZE * POINTS_PER_INCH, BASE_FIGURE_SIZE * POINTS_PER_INCH, tick_label_rotation))
+        return
+
+    # create bar chart
+    import numpy as np
+    import matplotlib.pyplot as plt
+    x = np.arange(len(stat))
     fig, ax = plt.subplots(figsize=[aspect_ratio*BASE_FIGURE_SIZE,BASE_FIGURE_SIZE], tight_layout=True)
     p = ax.bar(x, height, tick_label=tick_label, edgecolor='black')
     ax.bar_label(p)
@@ -94,10 +123,6 @@ def export_bar_chart(stat, file, aspect_ratio = 1, tick_label_rotation=0):
     ax.spines['right'].set_visible(False)
     plt.xticks(rotation=tick_label_rotation)
 
-    # create output directory if necessary
-    containing_dir = os.path.dirname(file)
-    if not os.path.isdir(containing_dir):
-        os.mkdir(containing_dir)
-
     # save figure
-    plt.savefig(file, transparent=True)
\ No newline at end of file
+    plt.savefig(file, transparent=True)
+    plt.close(fig)
\ No newline at end of file
@@ -0,0 +1,258 @@
+"""
+Table driven validation of the entries.
+
+The rules are declared in a table (see entry_rules) and compiled once into frozensets, regular expressions and
+ordering maps. Every entry is then checked against all rules and all problems are collected as ValidationError
+(with the id of the violated rule) instead of stopping at the first one.
+"""
+
+import re
+import json
+from collections import namedtuple
+from utils import utils, osg_parse, constants as c
+
+# pseudo fields for rules on the field names of an entry or of its building section
+FIELD_NAMES = '<field names>'
+BUILDING_FIELD_NAMES = '<building field names>'
+
+# the validation rules of the entries: (rule id, check, fields, parameter, message)
+# check is one of the keys of checks (see below), the message can use {field} and {value} (the offending value)
+entry_rules = (
+    ('field-order', 'ordered', (FIELD_NAMES,), c.valid_fields, 'Field "{value}" either misspelled or in wrong order'),
+    ('field-unique', 'unique', (FIELD_NAMES,), None, 'Field "{value}" appears twice'),
+    ('field-essential', 'required', (FIELD_NAMES,), c.essential_fields, 'Essential property "{value}" missing'),
+    ('building-field-unique', 'unique', (BUILDING_FIELD_NAMES,), None, 'Field "{value}" appears twice'),
+    ('building-field-valid', 'member', (BUILDING_FIELD_NAMES,), c.valid_building_fields, 'Building field "{value}" invalid'),
+    ('file-name', 'file-name', ('Title',), None, 'File name should be {value}'),
+    ('no-comment', 'no-comment', c.fields_without_comments, None, 'field without comments {field} has comment'),
+    ('state-valid', 'pattern', ('State',), r'(?:beta|mature|inactive since .*)\Z', 'Unknown state "{value}"'),
+    # some inactive entries have neither, so only both together is an error
+    ('state-exclusive', 'not-all', ('State',), ('beta', 'mature'), 'State must be one of <"beta", "mature">'),
+    ('url-prefix', 'prefix', c.url_fields, c.valid_url_prefixes, 'URL "{value}" in field "{field}" does not start with a valid prefix'),
+    ('repository-https', 'repository', ('Code repository',), r'https://', 'Repo "{value}" should start with https://'),
+    ('repository-git', 'repository', ('Code repository',), r'.*\.git\Z', 'Repo "{value}" should end on .git.'),
+    ('platform-order', 'ordered', ('Platform',), c.valid_platforms, 'Platform tag "{value}" either misspelled or in wrong order'),
+    ('keyword-exists', 'non-empty', ('Keyword',), None, 'Need at least one keyword'),
+    ('keyword-recommended', 'any-of', ('Keyword',), c.recommended_keywords, 'Entry contains no recommended keywords'),
+    ('language-known', 'member', ('Code language',), c.known_languages, 'Language "{value}" is not a known code language. Misspelled or new?'),
+    ('license-known', 'member', ('Code license',), c.known_licenses, 'License "{value}" is not a known license. Misspelled or new?'),
+)
+
+# repositories on these hosts are checked by the repository rules
+regex_checked_repository_hosts = re.compile(r'github|gitlab|git\.tuxfamily|git\.savannah')
+
+
+class ValidationError(namedtuple('ValidationError', ('file', 'rule', 'message'))):
+    """
+    A single problem of an entry. rule is the id of the violated rule (see entry_rules) or 'parse' if the entry
+    could not be parsed at all.
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        return '{} - {} [{}]'.format(self.file, self.message, self.rule)
+
+
+class EntryValidationError(RuntimeError):
+    """
+    Raised for invalid entries, contains all the problems (list of ValidationError).
+    """
+
+    def __init__(self, errors):
+        super().__init__('\n'.join(error.message for error in errors))
+        self.errors = errors
+
+
+# each check is created from the rule parameter and returns the offending values for the values of a field
+
+def _ordered(vocabulary):
+    order = {value: index for index, value in enumerate(vocabulary)}
+
+    def check(values, entry):
+        last = 0
+        for value in values:
+            index = order.get(value)
+            if index is None or index < last:
+                yield value
+            else:
+                last = index
+    return check
+
+
+def _unique(_):
+    def check(values, entry):
+        seen = set()
+        for value in values:
+            if value in seen:
+                yield value
+            seen.add(value)
+    return check
+
+
+def _required(vocabulary):
+    def check(values, entry):
+        values = set(values)
+        return (value for value in vocabulary if value not in values)
+    return check
+
+
+def _member(vocabulary):
+    vocabulary = frozenset(vocabulary)
+
+    def check(values, entry):
+        return (value for value in values if value not in vocabulary)
+    return check
+
+
+def _file_name(_):
+    from utils import osg  # not at the top, osg imports this module
+
+    def check(title, entry):
+        if not title:
+            return
+        file = entry.get('File', '')
+        canonical_file_name = osg.canonical_name(title) + '.md'
+        # we also allow -X with X =2..9 as possible extension (because of duplicate canonical file names)
+        if canonical_file_name != file and canonical_file_name != file[:-5] + '.md':
+            yield canonical_file_name
+    return check
+
+
+def _no_comment(_):
+    def check(values, entry):
+        if any(isinstance(value, osg_parse.Value) for value in values):
+            yield None
+    return check
+
+
+def _pattern(pattern):
+    regex = re.compile(pattern)
+
+    def check(values, entry):
+        return (value for value in values if not regex.match(value))
+    return check
+
+
+def _not_all(vocabulary):
+    def check(values, entry):
+        if all(value in values for value in vocabulary):
+            yield None
+    return check
+
+
+def _prefix(prefixes):
+    regex = re.compile('|'.join(re.escape(prefix) for prefix in prefixes))
+
+    def check(values, entry):
+        for value in values:
+            url = value[1:-1] if value.startswith('<') and value.endswith('>') else value
+            if not regex.match(url):
+                yield url
+    return check
+
+
+def _repository(pattern):
+    regex = re.compile(pattern)
+
+    def check(values, entry):
+        for repo in values:
+            if repo.startswith(('@', '?')):
+                continue
+            repo = repo.split(' ')[0].strip()
+            if regex_checked_repository_hosts.search(repo) and not regex.match(repo):
+                yield repo
+    return check
+
+
+def _non_empty(_):
+    def check(values, entry):
+        if not values:
+            yield None
+    return check
+
+
+def _any_of(vocabulary):
+    vocabulary = frozenset(vocabulary)
+
+    def check(values, entry):
+        if vocabulary.isdisjoint(values):
+            yield None
+    return check
+
+
+checks = {
+    'ordered': _ordered,
+    'unique': _unique,
+    'required': _required,
+    'member': _member,
+    'file-name': _file_name,
+    'no-comment': _no_comment,
+    'pattern': _pattern,
+    'not-all': _not_all,
+    'prefix': _prefix,
+    'repository': _repository,
+    'non-empty': _non_empty,
+    'any-of': _any_of,
+}
+
+
+def compile_rules(rules):
+    """
+    Compiles a rule table.
+    :param rules: Sequence of rules (rule id, check, fields, parameter, message), see entry_rules
+    :return: List of compiled rules (rule id, check function, fields, message)
+    """
+    compiled = []
+    for rule_id, check, fields, parameter, message in rules:
+        if check not in checks:
+            raise RuntimeError('Unknown check "{}" in rule {}'.format(check, rule_id))
+        compiled.append((rule_id, checks[check](parameter), fields, message))
+    return compiled
+
+
+_compiled_entry_rules = None
+
+
+def process_entry(entry):
+    """
+    Converts a parsed entry (list of (field, value) tuples, starting with the file) into a dictionary (also the
+    building section) and validates it.
+    :param entry: The parsed entry
+    :return: tuple (entry as dictionary, list of ValidationError)
+    """
+    global _compiled_entry_rules
+    if _compiled_entry_rules is None:
+        _compiled_entry_rules = compile_rules(entry_rules)
+
+    names = {FIELD_NAMES: [field for field, _ in entry]}
+    entry = dict(entry)
+    building = entry.get('Building', [])
+    names[BUILDING_FIELD_NAMES] = [field for field, _ in building]
+    entry['Building'] = dict(building)
+
+    file = entry.get('File')
+    errors = []
+    for rule_id, check, fields, message in _compiled_entry_rules:
+        for field in fields:
+            values = names[field] if field in names else entry.get(field, [])
+            for value in check(values, entry):
+                errors.append(ValidationError(file, rule_id, message.format(field=field, value=value)))
+    return entry, errors
+
+
+def write_report(errors, file):
+    """
+    Writes a machine-readable (json) report of validation errors.
+    :param errors: List of ValidationError
+    :param file: The report file
+    """
+    rules = {}
+    for error in errors:
+        rules[error.rule] = rules.get(error.rule, 0) + 1
+    report = {
+        'errors': [error._asdict() for error in errors],
+        'number of errors': len(errors),
+        'errors per rule': dict(sorted(rules.items())),
+        'files with errors': sorted(set(error.file for error in errors)),
+    }
+    utils.write_text(file, json.dumps(report, indent=1))
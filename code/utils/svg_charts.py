@@ -0,0 +1,152 @@
+"""
+Simple bar and pie charts written directly as SVG text. Only depending on standard Python.
+
+The output only depends on the data (no timestamps, no random ids, numbers with fixed precision), so the same data
+always gives the same file.
+"""
+
+import math
+from xml.sax.saxutils import escape
+
+# colors of the bars and pie wedges (the default color cycle of matplotlib)
+colors = ('#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf')
+
+FONT_SIZE = 10
+
+# average width of a character (relative to the font size), there is no font metric, texts are only estimated
+CHARACTER_WIDTH = 0.6
+
+
+def number(x):
+    """
+    Formats a coordinate with at most two decimals (without trailing zeros).
+    """
+    text = '{:.2f}'.format(x).rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
+
+
+def text_width(text):
+    """
+    Estimated width of a text.
+    """
+    return len(text) * CHARACTER_WIDTH * FONT_SIZE
+
+
+def svg(width, height, elements):
+    """
+    A complete svg document (size in pt like matplotlib) with the given elements.
+    """
+    return '\n'.join(['<?xml version="1.0" encoding="utf-8" standalone="no"?>',
+                      '<svg xmlns="http://www.w3.org/2000/svg" width="{0}pt" height="{1}pt" viewBox="0 0 {0} {1}" font-family="DejaVu Sans, Bitstream Vera Sans, Arial, sans-serif" font-size="{2}">'.format(number(width), number(height), FONT_SIZE)]
+                     + [' ' + element for element in elements] + ['</svg>', ''])
+
+
+def text(x, y, content, anchor='middle', rotation=0):
+    """
+    A text element at (x, y) (the baseline), rotated (in degrees, counter clockwise) around that point.
+    """
+    transform = ' transform="rotate({} {} {})"'.format(number(-rotation), number(x), number(y)) if rotation else ''
+    return '<text x="{}" y="{}" text-anchor="{}"{}>{}</text>'.format(number(x), number(y), anchor, transform, escape(str(content)))
+
+
+def tick_step(maximum, ticks=6):
+    """
+    A step between ticks of an axis from 0 to maximum (1, 2 or 5 times a power of ten, at least 1) giving about the
+    given number of ticks.
+    """
+    if maximum <= ticks:
+        return 1
+    step = 10 ** math.floor(math.log10(maximum / ticks))
+    for factor in (1, 2, 5, 10):
+        if maximum / (step * factor) <= ticks:
+            return step * factor
+
+
+def bar_chart(labels, values, width, height, tick_label_rotation=0):
+    """
+    A bar chart with a label at every bar and the value on top of each bar.
+    :param labels: Labels of the bars
+    :param values: Values of the bars (not negative)
+    :param width: Width of the chart (pt)
+    :param height: Height of the chart (pt)
+    :param tick_label_rotation: Rotation of the labels (in degrees, counter clockwise)
+    :return: The chart as svg text
+    """
+    # margins, enough space for the labels
+    maximum = max(values, default=0)
+    step = tick_step(maximum)
+    top = math.ceil(maximum / step) * step if maximum > 0 else 1
+    angle = math.radians(tick_label_rotation)
+    label_width = max((text_width(label) for label in labels), default=0)
+    left = text_width(str(top)) + 16
+    bottom = label_width * math.sin(angle) + FONT_SIZE * math.cos(angle) + 12
+    right = 10
+    margin_top = FONT_SIZE + 8
+    plot_width = width - left - right
+    plot_height = height - bottom - margin_top
+
+    def y(value):
+        return margin_top + plot_height * (1 - value / top)
+
+    elements = []
+
+    # y axis with ticks
+    elements.append('<path d="M {0} {1} L {0} {2} L {3} {2}" fill="none" stroke="black" stroke-width="0.8"/>'.format(number(left), number(margin_top), number(margin_top + plot_height), number(left + plot_width)))
+    for tick in range(0, top + 1, step):
+        elements.append('<path d="M {} {} h -3.5" stroke="black" stroke-width="0.8"/>'.format(number(left), number(y(tick))))
+        elements.append(text(left - 6, y(tick) + FONT_SIZE * 0.35, tick, anchor='end'))
+
+    # bars with values and labels
+    slot = plot_width / max(len(values), 1)
+    for index, (label, value) in enumerate(zip(labels, values)):
+        x = left + slot * (index + 0.5)
+        elements.append('<rect x="{}" y="{}" width="{}" height="{}" fill="{}" stroke="black" stroke-width="0.8"/>'.format(number(x - slot * 0.4), number(y(value)), number(slot * 0.8), number(y(0) - y(value)), colors[0]))
+        elements.append(text(x, y(value) - 3, value))
+        if tick_label_rotation:
+            elements.append(text(x + FONT_SIZE * 0.35 * math.sin(angle), y(0) + 6 + FONT_SIZE * math.cos(angle), label, anchor='end', rotation=tick_label_rotation))
+        else:
+            elements.append(text(x, y(0) + 6 + FONT_SIZE, label))
+
+    return svg(width, height, elements)
+
+
+def pie_chart(labels, values, size):
+    """
+    A pie chart with the labels outside and the percentages inside the wedges. The wedges start at the right and go
+    counter clockwise (like in matplotlib).
+    :param labels: Labels of the wedges
+    :param values: Values of the wedges (not negative)
+    :param size: Width and height of the chart (pt)
+    :return: The chart as svg text
+    """
+    total = sum(values)
+    center = size / 2
+    radius = size * 0.3
+
+    def point(angle, distance):
+        return center + distance * math.cos(angle), center - distance * math.sin(angle)
+
+    elements = []
+    start = 0
+    for index, (label, value) in enumerate(zip(labels, values)):
+        if not value:
+            continue
+        fraction = value / total
+        end = start + fraction * 2 * math.pi
+        color = colors[index % len(colors)]
+        if fraction == 1:
+            elements.append('<circle cx="{0}" cy="{0}" r="{1}" fill="{2}"/>'.format(number(center), number(radius), color))
+        else:
+            x0, y0 = point(start, radius)
+            x1, y1 = point(end, radius)
+            elements.append('<path d="M {0} {0} L {1} {2} A {3} {3} 0 {4} 0 {5} {6} Z" fill="{7}"/>'.format(number(center), number(x0), number(y0), number(radius), 1 if fraction > 0.5 else 0, number(x1), number(y1), color))
+        middle = (start + end) / 2
+        x, y = point(middle, radius * 0.8)
+        elements.append(text(x, y + FONT_SIZE * 0.35, '{:.1f}%'.format(fraction * 100)))
+        x, y = point(middle, radius * 1.15)
+        cosine = math.cos(middle)
+        anchor = 'middle' if abs(cosine) < 0.1 else ('start' if cosine > 0 else 'end')
+        elements.append(text(x, y + FONT_SIZE * 0.35 * (1 - math.sin(middle)), label, anchor=anchor))
+        start = end
+
+    return svg(size, size, elements)
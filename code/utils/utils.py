@@ -38,6 +38,23 @@ def write_text(file, text):
         f.write(text)
 
 
+def write_text_if_changed(file, text, write=True):
+    """
+    Writes a whole text file (UTF-8 encoded) like write_text, but only if the content of the file would change.
+    Unchanged files are not touched (and keep their modification time).
+    :param write: If False, nothing is written, only the comparison is done.
+    :return: True if the content of the file is (or would be) changed
+    """
+    try:
+        with open(file, mode='r', encoding='utf-8', newline='') as f:
+            changed = f.read() != text.replace('\n', os.linesep)
+    except (FileNotFoundError, UnicodeDecodeError):
+        changed = True
+    if changed and write:
+        write_text(file, text)
+    return changed
+
+
 def determine_archive_version_generic(name, leading_terms, trailing_terms):
     """
     Given an archive file name, tries to get version information. Generic version that can cut off leading and trailing
@@ -149,7 +166,7 @@ def determine_latest_last_modified_date(folder):
 def subprocess_run(cmd, display=True, shell=False, env={}):
     """
     Runs a cmd via subprocess and displays the std output in case of success or the std error output in case of failure
-    where it also stops execution.
+    where it also stops execution (with a RuntimeError containing the std error output).
     """
     result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=shell, env=dict(os.environ, **env))
     if result.returncode:
@@ -157,7 +174,7 @@ def subprocess_run(cmd, display=True, shell=False, env={}):
             print("error {} in call {}".format(result.returncode, cmd))
             print(result.stdout.decode('cp1252'))
             print(result.stderr.decode('cp1252'))
-        raise RuntimeError()
+        raise RuntimeError(result.stderr.decode('cp1252').strip())
     if display:
         print('  output: {}'.format(result.stdout.decode('cp1252')))
     return result.stdout.decode('cp1252')
@@ -0,0 +1,559 @@
+"""
+Helpers for building the static website incrementally. Only depending on standard Python (brotli is optional).
+"""
+
+import os
+import re
+import json
+import gzip
+import shutil
+import tempfile
+import time
+import unicodedata
+import functools
+from utils import utils, cache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None  # no .br files then
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows, locking with msvcrt then
+    import msvcrt
+
+# precompressed siblings of the output files (file.gz, file.br), which static hosts can serve directly
+compressed_encodings = ('gz', 'br') if brotli else ('gz',)
+
+# ioctl request for cloning a file (reflink) on Linux (btrfs, xfs, ...)
+FICLONE = 0x40049409
+
+
+def place_file(source, destination, mode='copy'):
+    """
+    Places a file at destination either as copy, as hard link or as reflink (a copy on write clone, Linux only). Falls
+    back to copying if the file system does not support hard links or reflinks.
+    :param mode: One of 'copy', 'hardlink', 'reflink'
+    :return: The mode actually used
+    """
+    if mode == 'hardlink':
+        try:
+            os.link(source, destination)
+            return mode
+        except OSError:
+            pass
+    elif mode == 'reflink':
+        try:
+            import fcntl
+            with open(source, 'rb') as s, open(destination, 'wb') as d:
+                fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+            return mode
+        except (ImportError, OSError):
+            if os.path.exists(destination):
+                os.remove(destination)
+    elif mode != 'copy':
+        raise RuntimeError('Unknown mode "{}" for placing files.'.format(mode))
+    shutil.copyfile(source, destination)
+    return 'copy'
+
+
+def lock_file(f, blocking=True):
+    """
+    Takes an exclusive lock on an open file (opened for writing). The lock is released when the file is closed (also if
+    the process dies). It only belongs to this process, not to child processes (for example of a process pool), which
+    could outlive it.
+    :param blocking: If True, waits until the lock is free, otherwise raises an OSError if it is held by another process
+    """
+    if fcntl:
+        fcntl.lockf(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        return
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return
+        except OSError:
+            if not blocking:
+                raise
+            time.sleep(0.1)
+
+
+# elements without end tag
+void_elements = frozenset(('area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'))
+
+
+# start and end tags, comments, doctype (text and attribute values never contain < or > unescaped)
+regex_tag = re.compile(r'<(?:(/?)([a-zA-Z][a-zA-Z0-9-]*)[^>]*?(/?)>|!--.*?-->|![^>]*>)', re.DOTALL)
+
+# elements with raw text content (which may contain < or >) and their end
+regex_raw_text_end = {tag: re.compile('</' + tag, re.IGNORECASE) for tag in ('script', 'style')}
+
+
+def check_tag_balance(text):
+    """
+    A fast structural check of generated HTML in a single streaming pass over the tags: every element (except the
+    void elements) must be closed, in the right order. Much faster than a full parse with html5lib, but does not check
+    which element may contain which. Raises a RuntimeError otherwise.
+    """
+    def position(index):
+        return 'line {}'.format(text.count('\n', 0, index) + 1)
+
+    open_elements = []
+    index = 0
+    while True:
+        match = regex_tag.search(text, index)
+        if match is None:
+            break
+        index = match.end()
+        closing, tag, self_closing = match.groups()
+        if tag is None or self_closing:
+            continue  # comment, doctype or <x/>
+        tag = tag.lower()
+        if tag in void_elements:
+            continue
+        if not closing:
+            open_elements.append((tag, match.start()))
+            if tag in regex_raw_text_end:
+                end = regex_raw_text_end[tag].search(text, index)
+                if end is None:
+                    raise RuntimeError('Element <{}> at {} is not closed'.format(tag, position(match.start())))
+                index = end.start()
+        elif not open_elements:
+            raise RuntimeError('Unexpected end tag </{}> at {}'.format(tag, position(match.start())))
+        else:
+            open_tag, start = open_elements.pop()
+            if open_tag != tag:
+                raise RuntimeError('End tag </{}> at {} does not match <{}> at {}'.format(tag, position(match.start()), open_tag, position(start)))
+    if open_elements:
+        tag, start = open_elements[-1]
+        raise RuntimeError('Element <{}> at {} is not closed'.format(tag, position(start)))
+
+
+# elements whose whitespace is significant or that are not html (kept as they are when minifying)
+regex_whitespace_preserving = re.compile(r'<(pre|textarea|script|style)\b.*?</\1\s*>', re.DOTALL | re.IGNORECASE)
+
+# block level elements (whitespace next to their tags is never rendered)
+block_elements = ('address', 'article', 'aside', 'blockquote', 'body', 'br', 'dd', 'details', 'div', 'dl', 'dt', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'head', 'header', 'hr', 'html', 'li', 'link', 'main', 'meta', 'nav', 'ol', 'p', 'section', 'summary', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'title', 'tr', 'ul')
+regex_block_whitespace = re.compile(r'(<!DOCTYPE[^>]*>|</?(?:{})\b[^>]*>)\s+|\s+(?=</?(?:{})\b)'.format('|'.join(block_elements), '|'.join(block_elements)), re.IGNORECASE)
+
+# whitespace before or after other tags (never inside attribute values, where < and > are escaped)
+regex_tag_whitespace = re.compile(r'(?<=>)\s+|\s+(?=<)')
+
+
+def minify_html(text):
+    """
+    Minifies generated HTML. Whitespace next to tags of block level elements is removed, other whitespace before and
+    after tags is collapsed to a single space. Browsers would not render it anyway, so the page looks the same. The
+    content of pre, textarea, script and style elements is kept as it is.
+    """
+    def minify(part):
+        part = regex_block_whitespace.sub(lambda match: match.group(1) or '', part)
+        return regex_tag_whitespace.sub(' ', part)
+    parts = []
+    index = 0
+    for match in regex_whitespace_preserving.finditer(text):
+        parts.append(minify(text[index:match.start()]))
+        parts.append(match.group(0))
+        index = match.end()
+    parts.append(minify(text[index:]))
+    return ''.join(parts)
+
+
+def write_compressed(file, data):
+    """
+    Writes the precompressed siblings (see compressed_encodings) of a file. gzip without timestamp, so that the same
+    data always gives the same file.
+    :param file: The (uncompressed) file
+    :param data: Content of the file (bytes)
+    :return: Dictionary encoding -> size of the compressed file
+    """
+    sizes = {}
+    for encoding in compressed_encodings:
+        if encoding == 'gz':
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        else:
+            compressed = brotli.compress(data, quality=11)
+        with open(file + '.' + encoding, 'wb') as f:
+            f.write(compressed)
+        sizes[encoding] = len(compressed)
+    return sizes
+
+
+# comments and license comments (/*! .. */) in style sheets
+regex_css_comment = re.compile(r'/\*.*?\*/', re.DOTALL)
+regex_css_license = re.compile(r'/\*!.*?\*/', re.DOTALL)
+
+# strings (skipped) and the characters structuring style sheets
+regex_css_structure = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|[{};]')
+
+# classes in selectors, classes inside :not() are not required for a selector to match
+regex_css_class = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+regex_css_not = re.compile(r':not\([^()]*\)')
+
+# at-rules containing rules (which are purged too), other at-rules (keyframes, font-face) are kept as they are
+nested_at_rules = ('@media', '@supports')
+
+# class attributes in html
+regex_class_attribute = re.compile(r'\sclass="([^"]*)"')
+
+
+def _css_block_end(text, index):
+    """
+    Index of the } closing the block starting at index (just after its {).
+    """
+    depth = 1
+    for match in regex_css_structure.finditer(text, index):
+        token = match.group(0)
+        if token == '{':
+            depth += 1
+        elif token == '}':
+            depth -= 1
+            if depth == 0:
+                return match.start()
+    raise RuntimeError('Unclosed block in style sheet at {}'.format(index))
+
+
+def _css_selectors(prelude):
+    """
+    Splits a selector list at the commas (not inside parentheses or attribute selectors).
+    """
+    selectors = []
+    depth = 0
+    start = 0
+    for index, character in enumerate(prelude):
+        if character in '([':
+            depth += 1
+        elif character in ')]':
+            depth -= 1
+        elif character == ',' and depth == 0:
+            selectors.append(prelude[start:index].strip())
+            start = index + 1
+    selectors.append(prelude[start:].strip())
+    return selectors
+
+
+def _purge_css_rules(text, index, classes):
+    """
+    Purges the rules from index to the end of the enclosing block (or of the text).
+    :return: tuple (purged rules, index after the end of the block)
+    """
+    parts = []
+    while True:
+        match = regex_css_structure.search(text, index)
+        while match and match.group(0)[0] in '"\'':
+            match = regex_css_structure.search(text, match.end())
+        if match is None or match.group(0) == '}':
+            return ''.join(parts), (match.end() if match else len(text))
+        prelude = text[index:match.start()].strip()
+        if match.group(0) == ';':
+            # statement like @charset or @import
+            parts.append(prelude + ';')
+            index = match.end()
+        elif prelude.startswith(nested_at_rules):
+            rules, index = _purge_css_rules(text, match.end(), classes)
+            if rules:
+                parts.append(prelude + '{' + rules + '}')
+        else:
+            end = _css_block_end(text, match.end())
+            if prelude.startswith('@'):
+                parts.append(prelude + text[match.start():end + 1])
+            else:
+                selectors = [selector for selector in _css_selectors(prelude) if classes.issuperset(css_classes(selector))]
+                if selectors:
+                    parts.append(','.join(selectors) + text[match.start():end + 1])
+            index = end + 1
+
+
+def css_classes(text):
+    """
+    The classes required by the selectors in a style sheet (or a single selector).
+    """
+    return set(regex_css_class.findall(regex_css_not.sub('', regex_css_comment.sub('', text))))
+
+
+def purge_css(text, classes):
+    """
+    Removes all rules of a style sheet with selectors that can never match because they require classes that are
+    not used. Selector lists are reduced to the selectors that can match, media queries without rules are removed.
+    Comments are removed too, license comments are kept at the beginning.
+    :param text: The style sheet
+    :param classes: All classes that are used
+    :return: The purged style sheet
+    """
+    rules, _ = _purge_css_rules(regex_css_comment.sub('', text), 0, frozenset(classes))
+    return ''.join(regex_css_license.findall(text)) + rules
+
+
+def html_classes(text):
+    """
+    The classes used in the class attributes of a html text.
+    """
+    return set(name for value in regex_class_attribute.findall(text) for name in value.split())
+
+
+def fingerprint(name, data):
+    """
+    The name of a file with (the beginning of) the digest of its content, for example osgl.js -> osgl.1a2b3c4d5e.js.
+    Files with such names can be cached forever, a changed file gets a new name.
+    :param data: Content of the file (bytes)
+    """
+    stem, extension = os.path.splitext(name)
+    return '{}.{}{}'.format(stem, cache.digest(data)[:10], extension)
+
+
+# words of the search index (letters and digits)
+regex_search_words = re.compile(r'[^\W_]+')
+
+# characters allowed in shard names of the search index (others are replaced by _)
+regex_shard_characters = re.compile(r'[^a-z0-9]')
+
+# number of texts whose search terms are cached (about 15000 different texts are indexed now), bounded because the
+# watch mode of the generator runs for a long time
+SEARCH_TERMS_CACHE_SIZE = 2**16
+
+
+@functools.lru_cache(maxsize=SEARCH_TERMS_CACHE_SIZE)
+def search_terms(text):
+    """
+    The terms of a text for the search index: its words (letters and digits) with at least two characters, in lower
+    case and without diacritics. Single characters are only indexed joined with the other words (0 A.D. as 0ad). The
+    search on the website must normalize the searched words the same way. Cached, many texts (keywords, developers)
+    are repeated.
+    :return: frozenset of terms
+    """
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(x for x in text if not unicodedata.category(x).startswith('M'))
+    words = regex_search_words.findall(text)
+    terms = set(word for word in words if len(word) > 1)
+    if len(words) > 1 and len(terms) < len(words):
+        terms.add(''.join(words))
+    return frozenset(terms)
+
+
+def search_shard(term):
+    """
+    Name of the shard of the search index containing a term (its first two characters).
+    """
+    return regex_shard_characters.sub('_', term[:2])
+
+
+def search_index(documents):
+    """
+    Builds an inverted index for searching on the website. It is sharded by the first two characters of the terms (see
+    search_shard), so a search only needs to load the shards of the searched words. Each shard contains the documents
+    it refers to, so a changed document only changes the shards of its terms.
+    :param documents: Iterable of (title, url, texts), the texts are indexed (see search_terms)
+    :return: Dictionary shard name -> shard, a shard has the documents ([title, url]) and the terms with the indices of
+    their documents (all sorted, so the same documents always give the same shards)
+    """
+    postings = {}
+    documents = sorted(documents, key=lambda x: (x[0].casefold(), x[1]))
+    for index, (_, _, texts) in enumerate(documents):
+        terms = set().union(*(search_terms(text) for text in texts))
+        for term in terms:
+            postings.setdefault(search_shard(term), {}).setdefault(term, []).append(index)
+    shards = {}
+    for name, terms in postings.items():
+        indices = sorted(set(index for term_indices in terms.values() for index in term_indices))
+        local = {index: position for position, index in enumerate(indices)}
+        shards[name] = {
+            'documents': [list(documents[index][:2]) for index in indices],
+            'terms': {term: [local[index] for index in terms[term]] for term in sorted(terms)}
+        }
+    return shards
+
+
+class BuildManifest:
+    """
+    Persistent record of the outputs of the last build. For every output file (path relative to the output directory,
+    with slashes) it stores the digest of everything the output was built from, a stable digest of the content and
+    size and modification time of the written file. Outputs are only up to date if the digest is the same and the
+    file was not changed in between (for example by a git checkout), which can be detected without reading the file.
+    The digest has to be computed for every output in every build, there is no dependency tracking.
+
+    New or changed outputs are written to a staging directory (see staged) first and only moved into the output
+    directory (see commit) if the build succeeded, so a failing build leaves the output directory untouched and no
+    output is ever half-written.
+
+    Only one build at a time can use a manifest (and its output directory). It is locked from its creation until it is
+    closed (see close, also closed at the end of a with statement), another build waits. Every build has its own
+    staging directory.
+    """
+
+    def __init__(self, file, output_path, rebuild=False):
+        """
+        :param file: The manifest file (json), the staging directories and the lock file are next to it
+        :param output_path: The directory the output paths are relative to
+        :param rebuild: If True, no output is up to date (everything is built again)
+        """
+        self.file = file
+        self.output_path = output_path
+        self.rebuild = rebuild
+        self.outputs = {}
+        self.produced = set()
+        path = os.path.dirname(file)
+        os.makedirs(path, exist_ok=True)
+        self.lock = open(file + '.lock', 'ab')
+        try:
+            lock_file(self.lock, blocking=False)
+        except OSError:
+            print('waiting for another build to finish')
+            lock_file(self.lock)
+        # staging directories left over from failed builds (no other build is running), then a new one for this build
+        for entry in os.scandir(path):
+            if entry.is_dir() and entry.name.startswith('staging'):
+                shutil.rmtree(entry.path, ignore_errors=True)
+        self.staging_path = tempfile.mkdtemp(prefix='staging-', dir=path)
+        if os.path.isfile(file):
+            try:
+                self.outputs = json.loads(utils.read_text(file))['outputs']
+            except (ValueError, KeyError):
+                self.outputs = {}  # broken, just start from scratch
+
+    def close(self):
+        """
+        Removes the staged outputs that were not committed (failed build) and releases the lock of the manifest
+        (without saving it, see save).
+        """
+        shutil.rmtree(self.staging_path, ignore_errors=True)
+        self.lock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def is_current(self, path, digest):
+        """
+        Checks if an output is up to date. Also marks the output as produced in this build.
+        :param path: Output path (relative, with slashes)
+        :param digest: Digest of everything the output is built from
+        """
+        self.produced.add(path)
+        record = self.outputs.get(path)
+        if self.rebuild or record is None or record['digest'] != digest:
+            return False
+        return self._unchanged(path, record)
+
+    def all_current(self, paths, digest):
+        """
+        Checks if all of a number of outputs (for example a file and its compressed versions) are up to date. Marks
+        all of them as produced in this build.
+        :param paths: Output paths (relative, with slashes)
+        :param digest: Digest of everything the outputs are built from
+        """
+        return all([self.is_current(path, digest) for path in paths])
+
+    def content(self, path, content_digest=None):
+        """
+        The content digest of an existing output. The recorded one, if the file is still the one written then,
+        otherwise (for example in a fresh clone, without manifest) it is computed from the file if a function for that
+        is given.
+        :param path: Output path (relative, with slashes)
+        :param content_digest: Function computing the content digest from the text of an output
+        :return: The content digest or None if not known
+        """
+        record = self.outputs.get(path)
+        if record is not None and record.get('content') is not None and self._unchanged(path, record):
+            return record['content']
+        file = os.path.join(self.output_path, path)
+        if content_digest is None or not os.path.isfile(file):
+            return None
+        return content_digest(utils.read_text(file))
+
+    def _unchanged(self, path, record):
+        try:
+            s = os.stat(os.path.join(self.output_path, path))
+        except OSError:
+            return False
+        return s.st_size == record['size'] and s.st_mtime_ns == record['mtime']
+
+    def staged(self, path):
+        """
+        The file to write a new or changed output to (in the staging directory).
+        :param path: Output path (relative, with slashes)
+        """
+        file = os.path.join(self.staging_path, path)
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        return file
+
+    def sync(self, path, source, mode='copy'):
+        """
+        Brings an output that is a plain copy of a source file (an asset) up to date. Only new or changed source files
+        (by size and modification time) are placed again.
+        :param path: Output path (relative, with slashes)
+        :param source: The source file
+        :param mode: One of 'copy', 'hardlink', 'reflink' (see place_file)
+        :return: True if the file was placed
+        """
+        s = os.stat(source)
+        digest = cache.digest(str(s.st_size), str(s.st_mtime_ns), mode)
+        if self.is_current(path, digest):
+            return False
+        place_file(source, self.staged(path), mode)
+        self.update(path, digest)
+        return True
+
+    def update(self, path, digest, content=None):
+        """
+        Records a (just written) output.
+        :param path: Output path (relative, with slashes)
+        :param digest: Digest of everything the output is built from
+        :param content: Stable digest of the content of the output
+        """
+        file = os.path.join(self.staging_path, path)
+        if not os.path.isfile(file):
+            file = os.path.join(self.output_path, path)  # unchanged, not staged
+        s = os.stat(file)  # moving the staged file keeps size and modification time
+        self.outputs[path] = {'digest': digest, 'content': content, 'size': s.st_size, 'mtime': s.st_mtime_ns}
+        self.produced.add(path)
+
+    def commit(self):
+        """
+        Moves the staged outputs into the output directory (each one atomically).
+        :return: Number of moved outputs
+        """
+        moved = 0
+        for dirpath, _, filenames in os.walk(self.staging_path):
+            for name in filenames:
+                file = os.path.join(dirpath, name)
+                destination = os.path.join(self.output_path, os.path.relpath(file, self.staging_path))
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                os.replace(file, destination)
+                moved += 1
+        shutil.rmtree(self.staging_path, ignore_errors=True)
+        return moved
+
+    def remove_stale(self, directories=()):
+        """
+        Deletes the outputs of previous builds that were not produced (or checked) in this build.
+        :param directories: Output directories (relative, with slashes) that only contain outputs of the build, any
+        other file in them is deleted too
+        :return: List of deleted output paths
+        """
+        stale = [path for path in self.outputs if path not in self.produced]
+        for directory in directories:
+            for dirpath, _, filenames in os.walk(os.path.join(self.output_path, directory)):
+                for name in filenames:
+                    path = os.path.relpath(os.path.join(dirpath, name), self.output_path).replace(os.sep, '/')
+                    if path not in self.produced and path not in self.outputs:
+                        stale.append(path)
+        for path in stale:
+            file = os.path.join(self.output_path, path)
+            if os.path.isfile(file):
+                os.remove(file)
+            self.outputs.pop(path, None)
+        return stale
+
+    def save(self):
+        """
+        Writes the manifest (atomically).
+        """
+        path = os.path.dirname(self.file)
+        os.makedirs(path, exist_ok=True)
+        fd, temporary_file = tempfile.mkstemp(dir=path, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'outputs': self.outputs}, f, indent=1, sort_keys=True)
+        os.replace(temporary_file, self.file)
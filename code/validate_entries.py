@@ -0,0 +1,31 @@
+"""
+Validates the entries changed since a git revision (default: HEAD, i.e. the working tree) together with their
+cross-references to developers and inspirations. Suitable as pre-commit hook or in CI.
+
+Usage: python validate_entries.py [revision] [--all] [--report file]
+
+With --all, all entries are validated (in parallel) instead. With --report, a machine-readable (json) report of all
+problems is written to the given file.
+
+Exits with a non-zero status if there are errors.
+"""
+
+import sys
+import argparse
+from utils import osg, osg_validation
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Validates entries.')
+    parser.add_argument('revision', nargs='?', default='HEAD', help='git revision to compare with')
+    parser.add_argument('--all', action='store_true', help='validate all entries')
+    parser.add_argument('--report', help='file for a json report of the problems')
+    args = parser.parse_args()
+
+    if args.all:
+        errors = osg.validate_entries(parallel=True)
+    else:
+        errors = osg.validate_changed_entries(args.revision)
+    if args.report:
+        osg_validation.write_report(errors, args.report)
+    sys.exit(1 if errors else 0)